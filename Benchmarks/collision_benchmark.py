@@ -0,0 +1,33 @@
+import pygame
+
+from Benchmarks.common import record, measure, print_results
+from Game.platforms import PlatformManager
+from Game.player import Player
+
+SCREEN_WIDTH, SCREEN_HEIGHT = 800, 900
+IDLE_KEYS = {pygame.K_a: False, pygame.K_d: False, pygame.K_w: False, pygame.K_UP: False}
+
+
+def make_world(platform_count):
+    platform_manager = PlatformManager(SCREEN_WIDTH, SCREEN_HEIGHT, seed=0, headless=True)
+    while len(platform_manager.platforms) < platform_count:
+        platform_manager.generate_next_platform(18)
+    player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, SCREEN_WIDTH, SCREEN_HEIGHT, headless=True)
+    return platform_manager, player
+
+
+def run(platform_counts=(50, 350, 1000, 5000), quick=False):
+    # Player.update per second against the spatial index and against a full scan of the sprite group
+    if quick:
+        platform_counts = platform_counts[:3]
+    results = []
+    for platform_count in platform_counts:
+        platform_manager, player = make_world(platform_count)
+        for lookup, platforms in (('index', platform_manager), ('group_scan', platform_manager.platforms)):
+            rate = measure(lambda: player.update(IDLE_KEYS, platforms))
+            results.append(record('player_update', rate, 'updates/s', platforms=platform_count, lookup=lookup))
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,39 @@
+import contextlib
+import io
+import time
+
+
+def record(benchmark, value, unit, higher_is_better=True, **params):
+    """One machine-readable result; (benchmark, params) identifies it across runs."""
+    return {'benchmark': benchmark, 'params': params, 'value': float(value), 'unit': unit,
+            'higher_is_better': higher_is_better}
+
+
+def result_key(result):
+    return result['benchmark'], tuple(sorted(result['params'].items()))
+
+
+def measure(fn, min_time=0.5, min_iterations=3):
+    """Call fn until min_time seconds have passed; returns calls per second."""
+    fn()  # Warm-up (lazy allocations, first-call caches)
+    iterations = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if iterations >= min_iterations and elapsed >= min_time:
+            return iterations / elapsed
+
+
+@contextlib.contextmanager
+def quiet():
+    # The game classes print progress on construction; keep benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def print_results(results):
+    for result in results:
+        params = ' '.join(f"{key}={value}" for key, value in result['params'].items())
+        print(f"{result['benchmark']:>18}  {params:<48} {result['value']:14.1f} {result['unit']}")
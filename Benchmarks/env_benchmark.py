@@ -0,0 +1,45 @@
+import random
+
+from Benchmarks.common import record, measure, quiet, print_results
+
+
+def make_loop(num_agents, vectorized_physics):
+    from Integration.training_loop import TrainingLoop
+    with quiet():
+        return TrainingLoop(num_agents, None, vectorized_physics=vectorized_physics, realtime=False, render_every=0,
+                            metrics=False, headless=True)
+
+
+def tick_function(training_loop):
+    # One simulation tick for every player, the way run_episode drives the game (no learning)
+    game_setup = training_loop.game_setup
+    num_agents = training_loop.num_agents
+    rng = random.Random(0)
+    if game_setup.vectorized_physics:
+        def tick():
+            training_loop.step_all([rng.randrange(3) for _ in range(num_agents)])
+            game_setup.update_platforms()
+    else:
+        def tick():
+            for agent_id in range(num_agents):
+                training_loop.step(agent_id, rng.randrange(3))
+            game_setup.update_platforms()
+    return tick
+
+
+def run(agent_counts=(1, 16, 128), quick=False):
+    if quick:
+        agent_counts = agent_counts[:2]
+    results = []
+    for num_agents in agent_counts:
+        for physics in ('scalar', 'vectorized'):
+            training_loop = make_loop(num_agents, physics == 'vectorized')
+            ticks_per_sec = measure(tick_function(training_loop))
+            training_loop.metrics.close()
+            results.append(record('env_step', ticks_per_sec * num_agents, 'agent steps/s',
+                                  num_agents=num_agents, physics=physics))
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
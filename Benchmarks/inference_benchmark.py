@@ -0,0 +1,32 @@
+import numpy as np
+import torch
+from Benchmarks.common import record, measure, print_results
+from ML.agent import Agent
+from ML.inference import ActorNetwork, BACKENDS
+
+
+def run(batch_sizes=(1, 16, 128), thread_counts=(1, None), quick=False):
+    # Greedy-action latency per batch through ActorNetwork, per backend and torch thread count
+    if quick:
+        batch_sizes = batch_sizes[:2]
+    default_threads = torch.get_num_threads()
+    agent = Agent(input_size=10, output_size=3)
+    results = []
+    try:
+        for threads in sorted({threads or default_threads for threads in thread_counts}):
+            torch.set_num_threads(threads)
+            for backend in BACKENDS:
+                actor = ActorNetwork(agent, backend)
+                actor.network()
+                for batch_size in batch_sizes:
+                    states = torch.from_numpy(np.random.rand(batch_size, 10).astype(np.float32) * 800)
+                    rate = measure(lambda: actor.greedy_actions(states))
+                    results.append(record('greedy_actions_latency', 1e6 / rate, 'us/batch', higher_is_better=False,
+                                          backend=backend, batch_size=batch_size, threads=threads))
+    finally:
+        torch.set_num_threads(default_threads)
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
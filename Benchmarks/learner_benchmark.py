@@ -0,0 +1,27 @@
+from Benchmarks.common import record, measure, print_results
+from Benchmarks.replay_benchmark import fill
+from ML.agent import Agent
+
+MEMORY_OPTIONS = {
+    'uniform_deque': {},
+    'uniform_array': {'array_memory': True},
+    'prioritized': {'prioritized_memory': True},
+}
+
+
+def run(batch_sizes=(32, 64, 256, 1024), memory_size=10000, quick=False):
+    # Agent.optimize_model calls per second, sampling included
+    if quick:
+        batch_sizes = batch_sizes[:3]
+    results = []
+    for memory, options in MEMORY_OPTIONS.items():
+        for batch_size in batch_sizes:
+            agent = Agent(input_size=10, output_size=3, batch_size=batch_size, capacity=memory_size, **options)
+            fill(agent.memory, memory_size)
+            rate = measure(agent.optimize_model)
+            results.append(record('optimize_model', rate, 'gradient steps/s', memory=memory, batch_size=batch_size))
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,28 @@
+import pickle
+
+from Benchmarks.common import record, measure, quiet, print_results
+from Integration.frame_channel import FrameChannel
+from Integration.game_setup import GameSetup
+
+
+def run(agent_counts=(16, 128), quick=False):
+    # Cost of building a frame in the game process and handing it to the display
+    results = []
+    for num_agents in agent_counts:
+        with quiet():
+            game_setup = GameSetup(num_agents, headless=True, with_agents=False, async_camera=False, verbose=False)
+        data = game_setup.get_render_data(1, 0)
+        results.append(record('render_data', measure(lambda: game_setup.get_render_data(1, 0)), 'frames/s',
+                              num_agents=num_agents))
+        results.append(record('render_frame_size', len(pickle.dumps(data)), 'bytes', higher_is_better=False,
+                              num_agents=num_agents))
+
+        frame_channel = FrameChannel(max_sprites=len(data['sprites']))
+        results.append(record('frame_publish', measure(lambda: frame_channel.publish(data)), 'frames/s',
+                              num_agents=num_agents))
+        frame_channel.close()
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,67 @@
+import torch
+
+from Benchmarks.common import record, measure, print_results
+from ML.memory import ReplayMemory, ArrayReplayMemory
+from ML.prioritized_memory import PrioritizedReplayMemory
+
+MEMORIES = {
+    'uniform_deque': lambda capacity: ReplayMemory(capacity),
+    'uniform_array': lambda capacity: ArrayReplayMemory(capacity, 10),
+    'prioritized': lambda capacity: PrioritizedReplayMemory(capacity, 10),
+}
+
+
+def transition(i, state_size=10):
+    return torch.randn(1, state_size), torch.tensor([[i % 3]]), torch.randn(1, state_size), torch.tensor([0.1])
+
+
+def fill(memory, count, state_size=10):
+    transitions = [transition(i, state_size) for i in range(min(count, 1000))]
+    for i in range(count):
+        memory.push(transitions[i % len(transitions)])
+
+
+def push_throughput(memory, pushes=1000):
+    # Transitions per second through push(), one at a time as the game loop does
+    transitions = [transition(i) for i in range(pushes)]
+
+    def push_all():
+        for t in transitions:
+            memory.push(t)
+    return measure(push_all) * pushes
+
+
+def sample_throughput(memory, batch_size):
+    # Batches per second, including what it takes to turn samples into batch tensors
+    if isinstance(memory, PrioritizedReplayMemory):
+        def sample():
+            batch = memory.sample_weighted(batch_size)
+            memory.update_priorities(batch[-1], torch.rand(batch_size).numpy())
+    elif isinstance(memory, ArrayReplayMemory):
+        def sample():
+            memory.sample_batch(batch_size)
+    else:
+        def sample():
+            transitions = memory.sample(batch_size)
+            states, actions, next_states, rewards = zip(*transitions)
+            torch.cat(states), torch.cat(actions), torch.cat(rewards)
+    return measure(sample)
+
+
+def run(capacities=(1000, 10000, 100000), batch_sizes=(64, 256), quick=False):
+    if quick:
+        capacities = capacities[:2]
+    results = []
+    for name, create in MEMORIES.items():
+        for capacity in capacities:
+            memory = create(capacity)
+            fill(memory, capacity)
+            results.append(record('replay_push', push_throughput(memory), 'transitions/s', memory=name, capacity=capacity))
+            for batch_size in batch_sizes:
+                results.append(record('replay_sample', sample_throughput(memory, batch_size), 'batches/s',
+                                      memory=name, capacity=capacity, batch_size=batch_size))
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,105 @@
+"""Run the benchmark suite and write machine-readable results:
+
+    python -m Benchmarks.run_all --output bench.json
+    python -m Benchmarks.run_all --output new.json --compare bench.json --tolerance 0.2
+
+With --compare, results that got worse than the baseline by more than the
+tolerance are listed and the exit code is 1, so CI can catch regressions.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+import numpy as np
+import pygame
+import torch
+
+from Benchmarks import (collision_benchmark, env_benchmark, inference_benchmark, learner_benchmark, render_benchmark,
+                        replay_benchmark)
+from Benchmarks.common import result_key, print_results
+
+SUITES = {
+    'env': env_benchmark,
+    'collision': collision_benchmark,
+    'replay': replay_benchmark,
+    'learner': learner_benchmark,
+    'inference': inference_benchmark,
+    'render': render_benchmark,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Results worse than the baseline by more than tolerance (as a fraction)."""
+    baseline_values = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = baseline_values.get(result_key(result))
+        if old is None or old['value'] <= 0 or result['value'] <= 0:
+            continue
+        ratio = result['value'] / old['value'] if result['higher_is_better'] else old['value'] / result['value']
+        if ratio < 1 - tolerance:
+            regressions.append((result, old, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ClimbSmart performance benchmarks.")
+    parser.add_argument('--output', default=None, help="write results as JSON to this file")
+    parser.add_argument('--only', default=None, help=f"comma-separated subset of: {', '.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help="smaller sizes, for a fast smoke run")
+    parser.add_argument('--compare', default=None, help="baseline JSON file from an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before a result counts as a regression")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else list(SUITES)
+    results = []
+    for name in names:
+        print(f"Running {name} benchmarks...")
+        suite_results = SUITES[name].run(quick=args.quick)
+        print_results(suite_results)
+        results += suite_results
+
+    report = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for result, old, ratio in regressions:
+            params = ' '.join(f"{key}={value}" for key, value in result['params'].items())
+            print(f"REGRESSION {result['benchmark']} {params}: {old['value']:.1f} -> {result['value']:.1f} {result['unit']} ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against '{args.compare}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
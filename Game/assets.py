@@ -0,0 +1,37 @@
+import collections
+import pygame
+
+# Process-wide image cache keyed by (path, size), bounded LRU
+MAX_CACHED_IMAGES = 64
+
+# Sprite ids used in render frames; the display maps them back to images
+SPRITE_PLATFORM = 0
+SPRITE_PLAYER = 1
+
+_image_cache = collections.OrderedDict()
+
+
+def load_image(path, size=None, headless=False):
+    """Cached surface for path, scaled to size; headless=True loads nothing and returns None."""
+    if headless:
+        return None
+
+    key = (path, tuple(size) if size is not None else None)
+    image = _image_cache.get(key)
+    if image is not None:
+        _image_cache.move_to_end(key)
+        return image
+
+    if size is None:
+        image = pygame.image.load(path)
+    else:
+        image = pygame.transform.scale(load_image(path), key[1])
+
+    _image_cache[key] = image
+    while len(_image_cache) > MAX_CACHED_IMAGES:
+        _image_cache.popitem(last=False)
+    return image
+
+
+def clear_image_cache():
+    _image_cache.clear()
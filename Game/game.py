@@ -10,16 +10,16 @@ script_dir = os.path.dirname(os.path.realpath(__file__))
 parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
 sys.path.append(parent_dir)
 
-from Integration import TrainingLoop
+from Integration import TrainingLoop, FrameChannel
 from Game.graphics import GraphicsHandler
 
-async def run_game_instance(queues, num_agents):
+async def run_game_instance(frame_channel, num_agents):
     try:
         pygame.init()
         pygame.font.init()
         print("Pygame initialized in run_game_instance")
 
-        training_loop = TrainingLoop(num_agents, queues, verbose=False)
+        training_loop = TrainingLoop(num_agents, frame_channel, verbose=False)
         print("Starting training loop...")
         await training_loop.run_game()
         print("Training loop completed.")
@@ -29,28 +29,53 @@ async def run_game_instance(queues, num_agents):
         pygame.quit()
         print("Pygame quit in run_game_instance")
 
-def run_game_instance_process(queues, num_agents):
+def run_game_instance_process(frame_channel, num_agents):
     loop = asyncio.get_event_loop()
-    loop.run_until_complete(run_game_instance(queues, num_agents))
+    loop.run_until_complete(run_game_instance(frame_channel, num_agents))
 
-def main():
+def open_display(screen_width=800, screen_height=900):
     pygame.init()
     pygame.font.init()
     print("Pygame initialized in main")
 
-    num_agents = 16  # Number of agents
-    screen_width, screen_height = 800, 900
-
     # Initialize the main screen
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption("ClimbSmart Multi-Agent")
+    return screen
+
+def draw_latest_frame(frame_channel, graphics, clock):
+    render_data = frame_channel.read()
+    if render_data is not None:  # Draw and present at most once per display frame
+        pygame.display.update(graphics.render(render_data, clock.get_time()))
+    clock.tick(60)  # Limit the frame rate to 60 FPS
 
-    queues = [multiprocessing.Queue() for _ in range(num_agents)]
+def run_viewer(frame_channel):
+    """Display process for a headless trainer (Integration.headless --viewer).
+
+    Closing the window only stops the viewer; training carries on."""
+    screen = open_display()
+    graphics = GraphicsHandler(screen)
     clock = pygame.time.Clock()
+    try:
+        while not any(event.type == pygame.QUIT for event in pygame.event.get()):
+            draw_latest_frame(frame_channel, graphics, clock)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pygame.quit()
+        print("Viewer closed")
+
+def main():
+    num_agents = 16  # Number of agents
+    screen = open_display()
+
+    frame_channel = FrameChannel()  # The game writes its newest frame here, we draw whatever is latest
+    clock = pygame.time.Clock()
+    graphics = GraphicsHandler(screen)
 
     # Run a single game instance
     print("Starting game process...")
-    game_process = multiprocessing.Process(target=run_game_instance_process, args=(queues, num_agents))
+    game_process = multiprocessing.Process(target=run_game_instance_process, args=(frame_channel, num_agents))
     game_process.start()
 
     try:
@@ -63,19 +88,14 @@ def main():
                     print("Pygame quit in main")
                     sys.exit()
 
-            for queue in queues:
-                if not queue.empty():
-                    render_data = queue.get()
-                    GraphicsHandler.render(screen, render_data)
-
-            pygame.display.flip()  # Ensure display is updated in the main process
-            clock.tick(60)  # Limit the frame rate to 60 FPS
+            draw_latest_frame(frame_channel, graphics, clock)
     except KeyboardInterrupt:
         print("Interrupted by user.")
     finally:
         print("Terminating game process...")
         game_process.terminate()
         game_process.join()
+        frame_channel.close()
         pygame.quit()
         print("Pygame quit in main")
 
@@ -1,32 +1,138 @@
+import collections
+import time
+import numpy as np
 import pygame
+from .assets import load_image, SPRITE_PLATFORM, SPRITE_PLAYER
+from .platforms import PLATFORM_IMAGE_PATH
+from .player import PLAYER_IMAGE_PATH
+
+SPRITE_PATHS = {SPRITE_PLATFORM: PLATFORM_IMAGE_PATH, SPRITE_PLAYER: PLAYER_IMAGE_PATH}
+SPRITE_COLORS = {SPRITE_PLATFORM: (0, 200, 0), SPRITE_PLAYER: (0, 120, 255)}  # Fallback when an image is missing
+STATIC_SPRITES = (SPRITE_PLATFORM,)  # Drawn into cached world-space tiles, redrawn only when they change
+MAX_CACHED_TILES = 8
+
 
 class GraphicsHandler:
+    """Draws frames from GameSetup.get_render_data onto screen.
+
+    Platforms are drawn in world coordinates into screen-sized tiles, one per
+    band of world height, which are only redrawn when the platforms in
+    their band change. A scrolling camera just blits the (at most two)
+    visible tiles at the new offset. When the camera is still, only the
+    areas under the moving sprites and the HUD are restored and redrawn.
+    Moving sprites outside the viewport are skipped. render() returns the
+    dirty rects, and the caller presents them once per display frame with
+    pygame.display.update(rects).
+    """
+
+    def __init__(self, screen, background=(0, 0, 0), text_color=(255, 0, 0)):
+        self.screen = screen
+        self.width, self.height = screen.get_size()
+        self.background = background
+        self.text_color = text_color
+        self.tiles = collections.OrderedDict()  # Tile index -> (static sprite rows it was drawn from, surface)
+        self.visible_tiles = []  # (world top, surface) of the tiles on screen
+        self.camera_offset_y = None  # Camera the screen's tiles were blitted for
+        self.font = None
+        self.text_cache = {}  # Text -> rendered surface, for the HUD lines
+        self.previous_rects = []  # Areas drawn over last frame that have to be restored
+        self.render_ms = 0.0
+
     @staticmethod
-    def render(screen, data):
-        screen.fill((0, 0, 0))  # Clear the screen with black
+    def sprite_image(sprite_id, size):
+        # Loaded and scaled once per (sprite, size) by the display process's own cache
+        path = SPRITE_PATHS.get(sprite_id)
+        return load_image(path, size) if path is not None else None
+
+    def visible(self, sprites, camera_offset_y):
+        # Rows whose rect overlaps the viewport after the camera offset
+        x, y, width, height = sprites[:, 0], sprites[:, 1] + camera_offset_y, sprites[:, 2], sprites[:, 3]
+        mask = (y < self.height) & (y + height > 0) & (x < self.width) & (x + width > 0)
+        return sprites[mask]
+
+    def draw_sprites(self, surface, sprites, camera_offset_y):
+        rects = []
+        for x, y, width, height, sprite_id in sprites.tolist():
+            rect = pygame.Rect(x, y + camera_offset_y, width, height)  # Adjust for camera offset
+            image = self.sprite_image(sprite_id, (width, height))
+            if image is None:
+                pygame.draw.rect(surface, SPRITE_COLORS.get(sprite_id, (255, 255, 255)), rect)
+            else:
+                surface.blit(image, rect)
+            rects.append(rect)
+        return rects
 
+    def tile(self, index, static_sprites):
+        """Surface for world rows [index * height, (index + 1) * height). Returns (surface, redrawn)."""
+        top = index * self.height
+        rows = static_sprites[(static_sprites[:, 1] < top + self.height) & (static_sprites[:, 1] + static_sprites[:, 3] > top)]
+        key = rows.tobytes()
+        cached = self.tiles.get(index)
+        if cached is not None:
+            self.tiles.move_to_end(index)
+            if cached[0] == key:
+                return cached[1], False
+            surface = cached[1]
+        elif len(self.tiles) >= MAX_CACHED_TILES:
+            surface = self.tiles.popitem(last=False)[1][1]  # Reuse the least recently shown tile's surface
+        else:
+            surface = pygame.Surface((self.width, self.height), 0, self.screen)  # Same pixel format as the screen
+        surface.fill(self.background)
+        self.draw_sprites(surface, rows, -top)
+        self.tiles[index] = (key, surface)
+        return surface, True
+
+    def restore(self, rect):
+        # Put back the platform tiles under rect
+        for top, surface in self.visible_tiles:
+            self.screen.blit(surface, rect, rect.move(0, -(top + self.camera_offset_y)))
+
+    def text(self, text):
+        surface = self.text_cache.get(text)
+        if surface is None:
+            if len(self.text_cache) > 256:
+                self.text_cache.clear()
+            surface = self.text_cache[text] = self.font.render(text, True, self.text_color)
+        return surface
+
+    def draw_hud(self, data, frame_ms):
+        if self.font is None:
+            if not pygame.font.get_init():  # Check if the font module is initialized
+                return []
+            self.font = pygame.font.Font(None, 36)
+        lines = [f"Score: {data['score']}", f"Episode: {data['episode']}"]
+        if frame_ms is not None:
+            lines.append(f"Frame: {frame_ms:.1f} ms (render {self.render_ms:.1f} ms)")
+        rects = []
+        for i, line in enumerate(lines):
+            rects.append(self.screen.blit(self.text(line), (10, 10 + 40 * i)))
+        return rects
+
+    def render(self, data, frame_ms=None):
+        """Draw one frame. frame_ms is shown in the HUD (e.g. clock.get_time()). Returns the dirty rects."""
+        start = time.perf_counter()
         camera_offset_y = data.get('camera_offset_y', 0)
+        sprites = data['sprites']
+        static = np.isin(sprites[:, 4], STATIC_SPRITES)
+        static_sprites = sprites[static]
+        moving_sprites = self.visible(sprites[~static], camera_offset_y)
+
+        first = -camera_offset_y // self.height  # Tile holding the world row at the top of the screen
+        tiles = [(index, *self.tile(index, static_sprites)) for index in (first, first + 1)]
+        full_redraw = camera_offset_y != self.camera_offset_y or any(redrawn for _, _, redrawn in tiles)
+        if full_redraw:
+            self.visible_tiles = [(index * self.height, surface) for index, surface, _ in tiles]
+            self.camera_offset_y = camera_offset_y
+            for top, surface in self.visible_tiles:
+                self.screen.blit(surface, (0, top + camera_offset_y))
+        else:
+            for rect in self.previous_rects:
+                self.restore(rect)  # What was under last frame's sprites
+
+        rects = self.draw_sprites(self.screen, moving_sprites, camera_offset_y)
+        rects += self.draw_hud(data, frame_ms)
 
-        # Drawing platforms
-        for platform in data['platforms']:
-            rect = pygame.Rect(platform['rect'])
-            rect = rect.move(0, camera_offset_y)  # Adjust for camera offset
-            image = pygame.image.fromstring(platform['image'], rect.size, 'RGBA')
-            screen.blit(image, rect)
-
-        # Drawing players
-        for player in data['players']:
-            rect = pygame.Rect(player['rect'])
-            rect = rect.move(0, camera_offset_y)  # Adjust for camera offset
-            image = pygame.image.fromstring(player['image'], rect.size, 'RGBA')
-            screen.blit(image, rect)
-
-        if pygame.font.get_init():  # Check if the font module is initialized
-            score_font = pygame.font.Font(None, 36)
-            score_text = score_font.render(f"Score: {data['score']}", True, (255, 0, 0))
-            screen.blit(score_text, (10, 10))
-
-            episode_text = score_font.render(f"Episode: {data['episode']}", True, (255, 0, 0))
-            screen.blit(episode_text, (10, 50))
-
-        pygame.display.flip()  # Update the display
+        dirty = [self.screen.get_rect()] if full_redraw else self.previous_rects + rects
+        self.previous_rects = rects
+        self.render_ms = (time.perf_counter() - start) * 1000
+        return dirty
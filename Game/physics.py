@@ -0,0 +1,183 @@
+import numpy as np
+
+# Action ids used by TrainingLoop.step: 0 = left (K_a), 1 = right (K_d), 2 = jump (K_w)
+ACTION_LEFT = 0
+ACTION_RIGHT = 1
+ACTION_JUMP = 2
+
+
+def _round_coord(values):
+    # pygame.Rect rounds float assignments half away from zero
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+class VectorizedPhysics:
+    """Steps every player in one batched call.
+
+    Positions are kept as integer rect coordinates (left/top) exactly like
+    pygame.Rect, so the results match Player.update frame for frame.
+    """
+
+    def __init__(self, num_agents, screen_width, screen_height, width=24, height=24,
+                 vel=10, jump_vel=-20, gravity=0.5):
+        self.num_agents = num_agents
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.width = width
+        self.height = height
+        self.vel = vel
+        self.jump_vel = jump_vel
+        self.gravity = gravity
+
+        self.left = np.zeros(num_agents, dtype=np.int64)
+        self.top = np.zeros(num_agents, dtype=np.int64)
+        self.vel_y = np.zeros(num_agents, dtype=np.float64)
+        self.is_jumping = np.zeros(num_agents, dtype=bool)
+        self.highest_y = np.zeros(num_agents, dtype=np.int64)
+        self.score = np.zeros(num_agents, dtype=np.int64)
+        self.high_score = np.zeros(num_agents, dtype=np.int64)
+        self.initial_x = np.zeros(num_agents, dtype=np.int64)
+        self.initial_y = np.zeros(num_agents, dtype=np.int64)
+
+        # Platform rects in group (insertion) order, as (left, top, right, bottom)
+        self.platform_rects = np.zeros((0, 4), dtype=np.int64)
+        self.platform_touched = np.zeros(0, dtype=bool)
+
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+    @property
+    def centerx(self):
+        return self.left + self.width // 2
+
+    @property
+    def centery(self):
+        return self.top + self.height // 2
+
+    def load_players(self, players):
+        for i, player in enumerate(players):
+            self.left[i] = player.rect.left
+            self.top[i] = player.rect.top
+            self.vel_y[i] = player.vel_y
+            self.is_jumping[i] = player.is_jumping
+            self.highest_y[i] = player.highest_y
+            self.score[i] = player.score
+            self.high_score[i] = player.high_score
+            self.initial_x[i] = player.initial_x
+            self.initial_y[i] = player.initial_y
+
+    def store_players(self, players):
+        # Write the simulated state back onto the sprites (used for rendering)
+        for i, player in enumerate(players):
+            player.rect.left = int(self.left[i])
+            player.rect.top = int(self.top[i])
+            player.vel_y = float(self.vel_y[i])
+            player.is_jumping = bool(self.is_jumping[i])
+            player.highest_y = int(self.highest_y[i])
+            player.score = int(self.score[i])
+            player.high_score = int(self.high_score[i])
+
+    def load_platforms(self, platforms):
+        rects = [(p.rect.left, p.rect.top, p.rect.right, p.rect.bottom) for p in platforms]
+        self.platform_rects = np.array(rects, dtype=np.int64).reshape(-1, 4)
+        self.platform_touched = np.zeros(len(rects), dtype=bool)
+
+    def store_platforms(self, platforms):
+        if not self.platform_touched.any():
+            return
+        sprites = platforms.sprites()
+        for i in np.flatnonzero(self.platform_touched):
+            sprites[i].on_platform = True
+        self.platform_touched[:] = False
+
+    def reset(self):
+        # Mirrors Player.reset: score, position and vertical state only
+        self.score[:] = 0
+        self.left[:] = self.initial_x - self.width // 2
+        self.top[:] = self.initial_y - self.height // 2
+        self.vel_y[:] = 0
+        self.is_jumping[:] = False
+
+    def _colliding(self):
+        # (num_agents, num_platforms) matrix of pygame.Rect.colliderect results
+        rects = self.platform_rects
+        left = self.left[:, None]
+        top = self.top[:, None]
+        right = left + self.width
+        bottom = top + self.height
+        return ((left < rects[None, :, 2]) & (rects[None, :, 0] < right) &
+                (top < rects[None, :, 3]) & (rects[None, :, 1] < bottom))
+
+    def _first(self, mask):
+        # Index of the first platform (group order) matching each row, -1 if none
+        hit = mask.any(axis=1)
+        return np.where(hit, mask.argmax(axis=1), -1)
+
+    def _update_score(self, current_y, mask=None):
+        climbed = self.highest_y - current_y
+        climbed_up = climbed > 0
+        if mask is not None:
+            climbed_up &= mask
+        self.score += np.where(climbed_up, climbed // 10, 0)
+        self.highest_y = np.where(climbed_up, current_y, self.highest_y)
+        if mask is None:
+            np.maximum(self.high_score, self.score, out=self.high_score)
+        else:
+            self.high_score = np.where(mask, np.maximum(self.high_score, self.score), self.high_score)
+
+    def step(self, actions):
+        """Advance all players by one frame. actions: int array of shape (num_agents,)."""
+        actions = np.asarray(actions).reshape(self.num_agents)
+
+        # handle_movement / jump
+        self.left -= np.where(actions == ACTION_LEFT, self.vel, 0)
+        self.left += np.where(actions == ACTION_RIGHT, self.vel, 0)
+        jump = (actions == ACTION_JUMP) & ~self.is_jumping
+        self.vel_y = np.where(jump, self.jump_vel, self.vel_y)
+        self.is_jumping |= jump
+
+        has_platforms = len(self.platform_rects) > 0
+
+        # handle_collision: land on the first platform the player is falling onto
+        if has_platforms:
+            rects = self.platform_rects
+            landing = self._colliding() & (self.vel_y[:, None] > 0) & \
+                (self.bottom[:, None] <= rects[None, :, 1] + self.vel_y[:, None])
+            index = self._first(landing)
+            landed = index >= 0
+            if landed.any():
+                hit = index[landed]
+                self.top = np.where(landed, rects[index, 1] - self.height, self.top)
+                self.vel_y = np.where(landed, 0.0, self.vel_y)
+                self.is_jumping &= ~landed
+                platform_centery = (rects[index, 1] + rects[index, 3]) // 2
+                self._update_score(platform_centery, landed)
+                self.platform_touched[hit] = True
+
+        # apply_gravity
+        self.top = _round_coord(self.centery + self.vel_y) - self.height // 2
+        self.vel_y = self.vel_y + self.gravity
+        on_platform = np.zeros(self.num_agents, dtype=bool)
+        if has_platforms:
+            index = self._first(self._colliding() & (self.vel_y[:, None] >= 0))
+            on_platform = index >= 0
+            if on_platform.any():
+                self.top = np.where(on_platform, self.platform_rects[index, 1] - self.height, self.top)
+                self.vel_y = np.where(on_platform, 0.0, self.vel_y)
+                self.is_jumping &= ~on_platform
+                self.platform_touched[index[on_platform]] = True
+        self.vel_y = np.where(on_platform, self.vel_y, self.vel_y + self.gravity)
+
+        self._update_score(self.bottom)
+
+        # Keep players inside the screen horizontally
+        np.maximum(self.left, 0, out=self.left)
+        np.minimum(self.left, self.screen_width - self.width, out=self.left)
+
+    def is_on_platform(self):
+        # Same check as Player.is_on_platform, for every player at once
+        if len(self.platform_rects) == 0:
+            return np.zeros(self.num_agents, dtype=bool)
+        standing = self._colliding() & (self.bottom[:, None] == self.platform_rects[None, :, 1])
+        return standing.any(axis=1)
@@ -1,67 +1,167 @@
+import bisect
 import pygame
 import random
+from .assets import load_image
+
+PLATFORM_IMAGE_PATH = "./Game/Assets/Tiles/tile_0000.png"
 
 class Platform(pygame.sprite.Sprite):
-    def __init__(self, centerx, centery, width, height):
+    def __init__(self, centerx, centery, width, height, headless=False):
         super().__init__()
-        self.image = pygame.image.load("./Game/Assets/Tiles/tile_0000.png")
-        self.image = pygame.transform.scale(self.image, (width, height))  # Scale the image to the desired width
-        self.rect = self.image.get_rect()
+        self.headless = headless  # No surface, only the rect
+        self.place(centerx, centery, width, height)
+
+    def place(self, centerx, centery, width, height):
+        # Also used to recycle pooled platforms at a new position
+        self.image = load_image(PLATFORM_IMAGE_PATH, (width, height), self.headless)  # Shared, already scaled surface (None when headless)
+        self.rect = self.image.get_rect() if self.image is not None else pygame.Rect(0, 0, width, height)
         
         # Update the rect attribute with custom hitbox size and position
         self.rect.centerx = centerx
         self.rect.centery = centery
         self.on_platform = False  # Initialize on_platform attribute
 
+class PlatformIndex:
+    """Platforms sorted by rect.top so collision queries only look at a few rows."""
+
+    def __init__(self):
+        self.tops = []  # Sorted rect.top values
+        self.entries = []  # Platforms in the same order as self.tops
+        self.max_height = 0
+        self.counter = 0  # Insertion counter, keeps query results in group order
+
+    def add(self, platform):
+        platform.index_order = self.counter
+        self.counter += 1
+        position = bisect.bisect_right(self.tops, platform.rect.top)
+        self.tops.insert(position, platform.rect.top)
+        self.entries.insert(position, platform)
+        self.max_height = max(self.max_height, platform.rect.height)
+
+    def remove(self, platform):
+        position = bisect.bisect_left(self.tops, platform.rect.top)
+        while self.entries[position] is not platform:
+            position += 1
+        del self.tops[position]
+        del self.entries[position]
+
+    def overlapping(self, rect):
+        # Only platforms whose top lies in (rect.top - max_height, rect.bottom) can overlap vertically
+        start = bisect.bisect_right(self.tops, rect.top - self.max_height)
+        end = bisect.bisect_left(self.tops, rect.bottom)
+        hits = [platform for platform in self.entries[start:end] if rect.colliderect(platform.rect)]
+        if len(hits) > 1:
+            hits.sort(key=lambda platform: platform.index_order)
+        return hits
+
 class PlatformManager:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, streaming=False, seed=None, lookahead=None, cull_margin=None,
+                 headless=False):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.platforms = pygame.sprite.Group()
+        self.index = PlatformIndex()
+        self.last_platform = None
+        self.version = 0  # Bumped whenever platforms are added or removed
+
+        # Streaming mode: platforms are generated ahead of the highest player and
+        # recycled once they fall below the lowest one, instead of a fixed 350.
+        self.streaming = streaming
+        self.seed = seed
+        self.lookahead = lookahead if lookahead is not None else screen_height
+        self.cull_margin = cull_margin if cull_margin is not None else screen_height
+        self.pool = []  # Recycled Platform objects
+        self.headless = headless  # Platforms are created without surfaces
+        self.random = random.Random(seed) if seed is not None else random
+        self.generate_bottom_platform()
+
+    def add_platform(self, platform):
+        self.platforms.add(platform)
+        self.index.add(platform)
+        self.last_platform = platform
+        self.version += 1
+
+    def recycle_platform(self, platform):
+        self.index.remove(platform)
+        platform.kill()
+        self.pool.append(platform)
+        self.version += 1
+
+    def create_platform(self, centerx, centery, width, height):
+        if self.pool:
+            platform = self.pool.pop()
+            platform.place(centerx, centery, width, height)
+            return platform
+        return Platform(centerx, centery, width, height, self.headless)
+
+    def reset(self):
+        # Recycle every platform and start the layout over (same layout again when seeded)
+        for platform in list(self.index.entries):
+            self.recycle_platform(platform)
+        self.last_platform = None
+        if self.seed is not None:
+            self.random = random.Random(self.seed)
         self.generate_bottom_platform()
 
+    def platforms_overlapping(self, rect):
+        """Platforms colliding with rect, in the same order as iterating self.platforms."""
+        return self.index.overlapping(rect)
+
     def generate_bottom_platform(self):
         platform_width = self.screen_width
         platform_height = 18  # Define the height of the platform
         platform_centerx = self.screen_width // 2
         platform_centery = self.screen_height - platform_height // 2
-        bottom_platform = Platform(platform_centerx, platform_centery, platform_width, platform_height)
-        self.platforms.add(bottom_platform)
+        bottom_platform = self.create_platform(platform_centerx, platform_centery, platform_width, platform_height)
+        self.add_platform(bottom_platform)
+
+    def generate_next_platform(self, platform_height):
+        last_platform = self.last_platform
+        platform_width = self.random.randint(24, 50)
+        platform_centerx = self.random.randint(platform_width // 2, self.screen_width - platform_width // 2)
+
+        # Ensure the next platform is not too far from the last one
+        min_distance = 65
+        while abs(platform_centerx - last_platform.rect.centerx) < min_distance:
+            platform_centerx = self.random.randint(platform_width // 2, self.screen_width - platform_width // 2)
+
+        # Adjust platform_centery to make platforms closer
+        platform_centery = last_platform.rect.centery - self.random.randint(60, 70)  # Adjust these values as needed, based on the desired platform spacing and height.
+        new_platform = self.create_platform(platform_centerx, platform_centery, platform_width, platform_height)
+        self.add_platform(new_platform)
+
+    def generate_up_to(self, y, platform_height=18):
+        # Keep generating until the topmost platform is above y
+        while self.last_platform.rect.top > y:
+            self.generate_next_platform(platform_height)
+
+    def recycle_below(self, y):
+        # Platforms are sorted by top, so the lowest ones are at the end of the index
+        while self.index.entries and self.index.entries[-1].rect.top > y:
+            self.recycle_platform(self.index.entries[-1])
 
     def generate_additional_platforms(self):
         platform_height = 18  # Define the height of the platform
+        if self.streaming:
+            self.generate_up_to(-self.lookahead, platform_height)
+            return
         while len(self.platforms) < 350:
-            last_platform = self.platforms.sprites()[-1]
-            platform_width = random.randint(24, 50)
-            platform_centerx = random.randint(platform_width // 2, self.screen_width - platform_width // 2)
-            
-            # Ensure the next platform is not too far from the last one
-            min_distance = 65
-            while abs(platform_centerx - last_platform.rect.centerx) < min_distance:
-                platform_centerx = random.randint(platform_width // 2, self.screen_width - platform_width // 2)
-
-            # Adjust platform_centery to make platforms closer
-            platform_centery = last_platform.rect.centery - random.randint(60, 70)  # Adjust these values as needed, based on the desired platform spacing and height.
-            new_platform = Platform(platform_centerx, platform_centery, platform_width, platform_height)
-            self.platforms.add(new_platform)
+            self.generate_next_platform(platform_height)
+
+    def update_stream(self, highest_y, lowest_y):
+        """Streaming update for all players at once: generate above highest_y, cull below lowest_y."""
+        self.generate_up_to(highest_y - self.lookahead)
+        self.recycle_below(lowest_y + self.cull_margin)
             
     def update(self, player):
         platform_height = player.height  # Get the height from the player object
+        if self.streaming:
+            # Fixed platform height so a seeded layout does not depend on the players
+            self.generate_up_to(player.rect.top - self.lookahead)
+            return
         # Generate platforms continuously
         while len(self.platforms) < 350:
-            last_platform = self.platforms.sprites()[-1]
-            platform_width = random.randint(24, 50)
-            platform_centerx = random.randint(platform_width // 2, self.screen_width - platform_width // 2)
-            
-            # Ensure the next platform is not too far from the last one
-            min_distance = 65
-            while abs(platform_centerx - last_platform.rect.centerx) < min_distance:
-                platform_centerx = random.randint(platform_width // 2, self.screen_width - platform_width // 2)
-
-            # Adjust platform_centery to make platforms closer
-            platform_centery = last_platform.rect.centery - random.randint(60, 70)  # Adjust these values as needed, based on the desired platform spacing and height.
-            new_platform = Platform(platform_centerx, platform_centery, platform_width, platform_height)
-            self.platforms.add(new_platform)
+            self.generate_next_platform(platform_height)
 
 
         # # Remove platforms that are out of view
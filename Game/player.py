@@ -1,19 +1,22 @@
 import pygame
+from .assets import load_image
+
+PLAYER_IMAGE_PATH = "./Game/Assets/Tiles/Characters/tile_0000.png"
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y, screen_width, screen_height):
+    def __init__(self, x, y, screen_width, screen_height, headless=False):
         super().__init__()
-        self.image_path = "./Game/Assets/Tiles/Characters/tile_0000.png"  # Image path
-        self.image = pygame.image.load(self.image_path)  # Load the image from the provided path
-        self.rect = self.image.get_rect()
+        self.image_path = PLAYER_IMAGE_PATH  # Image path
+        self.width = 24
+        self.height = 24
+        self.image = load_image(self.image_path, headless=headless)  # Cached surface, None when headless
+        self.rect = self.image.get_rect() if self.image is not None else pygame.Rect(0, 0, self.width, self.height)
         self.rect.centerx = x
         self.rect.centery = y
 
         self.screen_width = screen_width
         self.screen_height = screen_height
 
-        self.width = 24
-        self.height = 24
         self.vel = 10  # Initialize horizontal velocity
         self.vel_y = 0  # Initialize vertical velocity
         self.jump_vel = -20  # Initialize jump velocity
@@ -30,8 +33,14 @@ class Player(pygame.sprite.Sprite):
         self.initial_x = x
         self.initial_y = y
 
+    def colliding_platforms(self, platforms):
+        # Use the PlatformManager spatial index when given one, otherwise scan the group
+        if hasattr(platforms, 'platforms_overlapping'):
+            return platforms.platforms_overlapping(self.rect)
+        return [platform for platform in platforms if self.rect.colliderect(platform.rect)]
+
     def handle_collision(self, platforms):
-        for platform in platforms:
+        for platform in self.colliding_platforms(platforms):
             if self.rect.colliderect(platform.rect):
                 if self.vel_y > 0 and self.rect.bottom <= platform.rect.top + self.vel_y:
                     self.rect.bottom = platform.rect.top
@@ -42,7 +51,7 @@ class Player(pygame.sprite.Sprite):
 
 
     def check_collisions(self, platforms):
-        for platform in platforms:
+        for platform in self.colliding_platforms(platforms):
             if self.rect.colliderect(platform.rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform.rect.top
@@ -80,7 +89,7 @@ class Player(pygame.sprite.Sprite):
         self.rect.right = min(self.rect.right, self.screen_width)
 
     def is_on_platform(self, platforms):
-        for platform in platforms:
+        for platform in self.colliding_platforms(platforms):
             if self.rect.colliderect(platform.rect) and self.rect.bottom == platform.rect.top:
                 return True
         return False
@@ -99,7 +108,7 @@ class Player(pygame.sprite.Sprite):
         self.vel_y += self.gravity
 
         on_platform = False
-        for platform in platforms:
+        for platform in self.colliding_platforms(platforms):
             if self.rect.colliderect(platform.rect) and self.vel_y >= 0:
                 on_platform = True
                 platform.on_platform = True
@@ -3,5 +3,8 @@
 from .game_setup import GameSetup
 from .game_ai_integrations import GameAIIntegrations
 from .training_loop import TrainingLoop
+from .climb_env import ClimbEnv, ClimbVecEnv
+from .subproc_env import SubprocClimbVecEnv
+from .frame_channel import FrameChannel
 from .evaluation import Evaluation
 from .utilities import handle_events, update_display
@@ -0,0 +1,114 @@
+import numpy as np
+from Game.physics import ACTION_LEFT, ACTION_RIGHT, ACTION_JUMP
+from .game_setup import GameSetup
+from .observations import OBSERVATION_SIZE
+
+NUM_ACTIONS = 3
+
+
+def compute_rewards(physics, actions, on_platform, screen_height):
+    """Vectorized TrainingLoop.calculate_reward for every agent at once.
+
+    Like calculate_reward, this compares score with high_score after the
+    physics step has already raised high_score, so the +100 new-high-score
+    bonus never fires there either; it is kept so both stay in step.
+    """
+    above_start = physics.centery < (screen_height // 2 - 50)
+    new_high_score = physics.score > physics.high_score
+    jump_reward = 1 + np.where(new_high_score, 100, 0)
+    move = (actions == ACTION_LEFT) | (actions == ACTION_RIGHT)
+    reward = np.where((actions == ACTION_JUMP) & on_platform, jump_reward, np.where(move, 0.1, -0.05))
+    rewards = np.where(above_start, reward, 0.0).astype(np.float32)
+
+    # calculate_reward records the new high score for the jumping agents
+    record = above_start & (actions == ACTION_JUMP) & on_platform & new_high_score
+    physics.high_score = np.where(record, physics.score, physics.high_score)
+    return rewards
+
+
+class ClimbVecEnv:
+    """N agents climbing the same world, stepped with one batched physics call.
+
+    reset() -> observations of shape (N, 10)
+    step(actions) -> observations (N, 10), rewards (N,), dones (N,), info
+
+    Episodes last max_steps simulation ticks. When an episode ends the world is
+    reset automatically; the final observations are returned in
+    info['terminal_observation']. Scores restart at 0 each episode, while
+    highest_y and high_score carry over as they do between TrainingLoop
+    episodes, so points only come from climbing above earlier episodes.
+    """
+
+    def __init__(self, num_agents, max_steps=1200, seed=None, streaming=True):
+        self.num_agents = num_agents
+        self.max_steps = max_steps
+        self.observation_size = OBSERVATION_SIZE
+        self.num_actions = NUM_ACTIONS
+        self.game_setup = GameSetup(num_agents, vectorized_physics=True, streaming=streaming, seed=seed,
+                                    headless=True, with_agents=False, async_camera=False, verbose=False)
+        self.physics = self.game_setup.physics
+        self.steps = 0
+        self.episode = 0
+
+    def reset(self):
+        self.sync_sprites()  # Player.reset keeps highest_y and high_score, which live in the physics arrays
+        self.game_setup.reset_players()
+        self.game_setup.reset_platform_manager()
+        self.steps = 0
+        self.episode += 1
+        return self.get_observations()
+
+    def get_observations(self):
+        # Same features as GameSetup.get_state, for all agents at once; a copy the caller may keep
+        return self.game_setup.get_observations().copy()
+
+    def update_platforms(self):
+        platform_manager = self.game_setup.platform_manager
+        if platform_manager.streaming:
+            platform_manager.update_stream(int(self.physics.top.min()), int(self.physics.bottom.max()))
+        self.game_setup.sync_physics_platforms()
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_agents)
+        self.physics.step(actions)
+        on_platform = self.physics.is_on_platform()
+        rewards = compute_rewards(self.physics, actions, on_platform, self.game_setup.screen_height)
+        self.update_platforms()
+        self.steps += 1
+
+        observations = self.get_observations()
+        info = {'scores': self.physics.score.copy()}
+        done = self.steps >= self.max_steps
+        dones = np.full(self.num_agents, done, dtype=bool)
+        if done:
+            info['terminal_observation'] = observations
+            observations = self.reset()
+        return observations, rewards, dones, info
+
+    def sync_sprites(self):
+        # Copy the simulated state onto the player sprites, e.g. before rendering
+        self.physics.store_players(self.game_setup.players)
+
+    def close(self):
+        self.game_setup.is_running = False
+
+
+class ClimbEnv:
+    """Single-agent view of ClimbVecEnv with scalar reward and done."""
+
+    def __init__(self, max_steps=1200, seed=None, streaming=True):
+        self.vec_env = ClimbVecEnv(1, max_steps=max_steps, seed=seed, streaming=streaming)
+        self.observation_size = OBSERVATION_SIZE
+        self.num_actions = NUM_ACTIONS
+
+    def reset(self):
+        return self.vec_env.reset()[0]
+
+    def step(self, action):
+        observations, rewards, dones, info = self.vec_env.step([action])
+        if 'terminal_observation' in info:
+            info['terminal_observation'] = info['terminal_observation'][0]
+        return observations[0], float(rewards[0]), bool(dones[0]), info
+
+    def close(self):
+        self.vec_env.close()
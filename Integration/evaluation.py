@@ -1,7 +1,165 @@
+"""Greedy evaluation of trained networks, headless and fast-forward:
+
+    python -m Integration.evaluation checkpoints/checkpoint_000100.pt --episodes 64 --workers 8
+
+Every episode is one player in a fresh seeded ClimbVecEnv acting with
+epsilon=0, so results are reproducible for a given checkpoint, seed and
+episode count. (Players in one env start at the same spot and a greedy
+policy is deterministic, so extra players would only repeat the same
+trajectory; distributions are taken over seeds instead.)
+"""
+import argparse
+import json
+import multiprocessing
+import time
+import numpy as np
+import torch
+from ML.dqn_model import DQN
+from ML.inference import BACKENDS, compile_network, set_torch_threads
+from .climb_env import ClimbVecEnv, NUM_ACTIONS
+from .observations import OBSERVATION_SIZE
+
+
+def load_dqn_state(path, agent_index=0):
+    """The DQN weights in path: a CheckpointManager checkpoint or a plain state_dict."""
+    state = torch.load(path, map_location='cpu')
+    if 'agents' in state:
+        return state['agents'][agent_index]['dqn']
+    return state
+
+
+def _run_episodes(dqn_state, seeds, max_steps, streaming, backend='eager', envs_per_batch=16):
+    # Runs in a spawned pool worker: one thread each, the pool provides the parallelism.
+    # Up to envs_per_batch single-player episodes (one per seed) are stepped in lockstep so
+    # the network still sees a batch; every episode lasts exactly max_steps ticks.
+    set_torch_threads(1)
+    dqn = DQN(OBSERVATION_SIZE, NUM_ACTIONS)
+    dqn.load_state_dict(dqn_state)
+    dqn.eval()
+    network = compile_network(dqn, backend)
+    results = []
+    for first in range(0, len(seeds), envs_per_batch):
+        batch_seeds = seeds[first:first + envs_per_batch]
+        envs = [ClimbVecEnv(1, max_steps=max_steps, seed=seed, streaming=streaming) for seed in batch_seeds]
+        observations = np.concatenate([env.reset() for env in envs])
+        start_y = observations[:, 1].copy()
+        best_y = start_y.copy()
+        total_rewards = np.zeros(len(envs), dtype=np.float64)
+        scores = np.zeros(len(envs), dtype=np.int64)
+        for _ in range(max_steps):
+            if backend == 'numpy':
+                actions = network(observations).argmax(1)
+            else:
+                with torch.inference_mode():
+                    actions = network(torch.from_numpy(observations)).argmax(1).numpy()
+            for i, env in enumerate(envs):
+                env_observations, rewards, dones, info = env.step(actions[i:i + 1])
+                total_rewards[i] += rewards[0]
+                scores[i] = info['scores'][0]
+                # The env resets itself at the end; the final state is in terminal_observation
+                final = info['terminal_observation'] if dones[0] else env_observations
+                best_y[i] = min(best_y[i], final[0, 1])
+                observations[i] = env_observations[0]
+        for env in envs:
+            env.close()
+        for i, seed in enumerate(batch_seeds):
+            results.append({'seed': seed, 'score': int(scores[i]), 'height': float(start_y[i] - best_y[i]),
+                            'reward': float(total_rewards[i])})
+    return results
+
+
+def summarize(values):
+    values = np.asarray(values, dtype=np.float64)
+    p10, p25, median, p75, p90 = np.percentile(values, [10, 25, 50, 75, 90])
+    return {'mean': float(values.mean()), 'std': float(values.std()), 'min': float(values.min()),
+            'p10': float(p10), 'p25': float(p25), 'median': float(median), 'p75': float(p75), 'p90': float(p90),
+            'max': float(values.max())}
+
+
 class Evaluation:
-    def __init__(self, ai_integrations):
+    """Scores a policy over many seeded greedy episodes spread across a process pool.
+
+    evaluate_agent() takes a checkpoint path, or evaluates the live network of
+    ai_integrations[agent_index] when no path is given. Episodes always run in
+    freshly spawned processes, even with one worker, so the caller's torch
+    threads are left alone and a trainer's threads are never forked.
+    """
+
+    def __init__(self, ai_integrations=None, max_steps=1200, streaming=True, num_workers=None, backend='eager'):
         self.ai_integrations = ai_integrations
+        self.max_steps = max_steps
+        self.streaming = streaming
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.backend = backend  # ML.inference backend; see Benchmarks/inference_benchmark.py for their latency
+
+    def dqn_state(self, checkpoint=None, agent_index=0):
+        if checkpoint is not None:
+            return load_dqn_state(checkpoint, agent_index)
+        if not self.ai_integrations:
+            raise ValueError("Evaluation needs a checkpoint path or ai_integrations")
+        network = self.ai_integrations[agent_index].agent.policy_network()
+        return {key: value.detach().cpu().clone() for key, value in network.state_dict().items()}
+
+    def evaluate_agent(self, checkpoint=None, episodes=32, seed=0, agent_index=0):
+        dqn_state = self.dqn_state(checkpoint, agent_index)
+        input_size = dqn_state['fc1.weight'].shape[1]
+        if input_size != OBSERVATION_SIZE:
+            raise ValueError(f"Network expects {input_size} inputs, observations have {OBSERVATION_SIZE}")
+
+        seeds = list(range(seed, seed + episodes))
+        workers = max(1, min(self.num_workers, episodes))
+        chunks = [seeds[i::workers] for i in range(workers)]
+        args = [(dqn_state, chunk, self.max_steps, self.streaming, self.backend) for chunk in chunks]
+
+        start = time.perf_counter()
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            episode_results = [result for chunk in pool.starmap(_run_episodes, args) for result in chunk]
+        elapsed = time.perf_counter() - start
+        episode_results.sort(key=lambda result: result['seed'])
+
+        def collect(field):
+            return [result[field] for result in episode_results]
+        return {
+            'checkpoint': checkpoint,
+            'episodes': episodes,
+            'max_steps': self.max_steps,
+            'workers': workers,
+            'backend': self.backend,
+            'seconds': elapsed,
+            'episodes_per_sec': episodes / elapsed,
+            'env_steps_per_sec': episodes * self.max_steps / elapsed,
+            'score': summarize(collect('score')),
+            'height': summarize(collect('height')),
+            'reward': summarize(collect('reward')),
+            'per_episode': episode_results,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a trained ClimbSmart network greedily.")
+    parser.add_argument('checkpoint', help="CheckpointManager checkpoint or DQN state_dict file")
+    parser.add_argument('--agent-index', type=int, default=0, help="which agent of a multi-agent checkpoint")
+    parser.add_argument('--episodes', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0, help="first episode seed; episodes use seed, seed+1, ...")
+    parser.add_argument('--max-steps', type=int, default=1200, help="simulation ticks per episode")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument('--backend', choices=BACKENDS, default='eager', help="how the workers run the network")
+    parser.add_argument('--json', default=None, help="also write the full report to this file")
+    args = parser.parse_args(argv)
+
+    evaluation = Evaluation(max_steps=args.max_steps, num_workers=args.workers,
+                            backend=args.backend)
+    report = evaluation.evaluate_agent(args.checkpoint, episodes=args.episodes, seed=args.seed, agent_index=args.agent_index)
+    print(f"{report['episodes']} episodes in {report['seconds']:.1f}s "
+          f"({report['episodes_per_sec']:.2f} episodes/s, {report['env_steps_per_sec']:.0f} env steps/s)")
+    for name in ('score', 'height', 'reward'):
+        stats = report[name]
+        print(f"{name:>7}: mean {stats['mean']:.1f}  median {stats['median']:.1f}  "
+              f"p10 {stats['p10']:.1f}  p90 {stats['p90']:.1f}  max {stats['max']:.1f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
 
-    def evaluate_agent(self):
-        # Evaluation logic here...
-        pass
+if __name__ == "__main__":
+    main()
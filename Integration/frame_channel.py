@@ -0,0 +1,87 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+# Header slots (float64): sequence number, sprite count, then the HUD values
+_SEQ, _COUNT, _SCORE, _EPISODE, _TOTAL_REWARD, _CAMERA = range(6)
+_HEADER_SIZE = 8
+SPRITE_FIELDS = 5  # x, y, width, height, sprite id
+
+
+def _views(block, max_sprites):
+    # The views are only valid while the block stays open
+    header = np.ndarray((_HEADER_SIZE,), dtype=np.float64, buffer=block.buf)
+    sprites = np.ndarray((max_sprites, SPRITE_FIELDS), dtype=np.int32, buffer=block.buf, offset=header.nbytes)
+    return header, sprites
+
+
+class FrameChannel:
+    """Single latest-frame slot in shared memory between the game and the display process.
+
+    The game publishes the frame from GameSetup.get_render_data() (a compact
+    int32 array of sprite rects and ids plus the HUD values); the display
+    reads whatever frame is newest and never sees a backlog. Frames that are
+    overwritten before they are read are simply dropped. Create it in the
+    parent and hand it to the child process; the child attaches by name.
+    """
+
+    def __init__(self, max_sprites=1024):
+        self.max_sprites = max_sprites
+        size = _HEADER_SIZE * 8 + max_sprites * SPRITE_FIELDS * 4
+        self.block = shared_memory.SharedMemory(create=True, size=size)
+        self.owner = True
+        self.lock = multiprocessing.Lock()
+        self.header, self.sprites = _views(self.block, max_sprites)
+        self.header[:] = 0
+        self.last_read = 0
+        self.warned = False
+
+    def __getstate__(self):
+        return {'name': self.block.name, 'max_sprites': self.max_sprites, 'lock': self.lock}
+
+    def __setstate__(self, state):
+        self.max_sprites = state['max_sprites']
+        self.block = shared_memory.SharedMemory(name=state['name'])
+        self.owner = False
+        self.lock = state['lock']
+        self.header, self.sprites = _views(self.block, self.max_sprites)
+        self.last_read = 0
+        self.warned = False
+
+    def publish(self, data):
+        sprites = data['sprites']
+        if len(sprites) > self.max_sprites:
+            if not self.warned:
+                print(f"Frame has {len(sprites)} sprites, only the last {self.max_sprites} are displayed")
+                self.warned = True
+            sprites = sprites[-self.max_sprites:]  # Players come last, keep them
+        with self.lock:
+            self.sprites[:len(sprites)] = sprites
+            self.header[_COUNT] = len(sprites)
+            self.header[_SCORE] = data['score']
+            self.header[_EPISODE] = data['episode']
+            self.header[_TOTAL_REWARD] = data['total_reward']
+            self.header[_CAMERA] = data['camera_offset_y']
+            self.header[_SEQ] += 1
+
+    def read(self):
+        """Return a copy of the newest frame, or None if nothing new was published."""
+        with self.lock:
+            seq = int(self.header[_SEQ])
+            if seq == self.last_read:
+                return None
+            self.last_read = seq
+            count = int(self.header[_COUNT])
+            return {
+                'sprites': self.sprites[:count].copy(),
+                'score': int(self.header[_SCORE]),
+                'episode': int(self.header[_EPISODE]),
+                'total_reward': float(self.header[_TOTAL_REWARD]),
+                'camera_offset_y': int(self.header[_CAMERA]),
+            }
+
+    def close(self):
+        del self.header, self.sprites
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
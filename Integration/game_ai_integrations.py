@@ -1,12 +1,15 @@
-from torch.utils.tensorboard import SummaryWriter
-
 class GameAIIntegrations:
-    def __init__(self, agent, replay_memory):
+    def __init__(self, agent, replay_memory, decay_epsilon=True, writer=None):
         self.agent = agent
+        self.decay_epsilon = decay_epsilon  # False for extra players driven by an already-decayed shared agent
         self.replay_memory = replay_memory
-        self.writer = SummaryWriter('runs/ClimbSmart')
+        if writer is None:
+            from torch.utils.tensorboard import SummaryWriter
+            writer = SummaryWriter('runs/ClimbSmart')
+        self.writer = writer  # Usually the run's shared MetricsLogger
 
     def select_action_and_update(self, state):
         action = self.agent.select_action(state)
-        self.agent.update_epsilon()
+        if self.decay_epsilon:
+            self.agent.update_epsilon()
         return action
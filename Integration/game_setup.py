@@ -1,31 +1,74 @@
-import pygame
+import numpy as np
 import torch
 import asyncio
 from ML.memory import ReplayMemory
 from ML.agent import Agent
 from Game.platforms import PlatformManager
 from Game.player import Player
+from Game.physics import VectorizedPhysics
+from Game.assets import SPRITE_PLATFORM, SPRITE_PLAYER
+from .frame_channel import SPRITE_FIELDS
+from .observations import ObservationBuilder, OBSERVATION_SIZE
 
 class GameSetup:
-    def __init__(self, num_agents):
+    def __init__(self, num_agents, vectorized_physics=False, streaming=False, seed=None, headless=False,
+                 with_agents=True, async_camera=True, verbose=True, agent_kwargs=None, shared_learner=False):
+        self.headless = headless  # Sprites are created without surfaces
+        self.verbose = verbose
         self.is_running = True
         self.screen_width = 800
         self.screen_height = 900
         self.camera_offset_y = 0
         self.num_agents = num_agents
-        self.players = [Player(self.screen_width // 2, self.screen_height - 20, self.screen_width, self.screen_height) for _ in range(num_agents)]
-        self.platform_manager = PlatformManager(self.screen_width, self.screen_height)
-        self.agents = [Agent(input_size=10, output_size=3) for _ in range(num_agents)]
-        self.replay_memory = ReplayMemory(10000)
+        self.players = [Player(self.screen_width // 2, self.screen_height - 20, self.screen_width, self.screen_height, headless)
+                        for _ in range(num_agents)]
+        self.platform_manager = PlatformManager(self.screen_width, self.screen_height, streaming=streaming, seed=seed,
+                                                headless=headless)
+        # Environments driven by an external trainer (e.g. ClimbVecEnv) don't need the built-in agents
+        agent_kwargs = agent_kwargs or {}  # Extra Agent options, e.g. array_memory=True
+        self.shared_learner = shared_learner
+        if with_agents and shared_learner:
+            # One network, optimizer and replay buffer acting for every player; more agents
+            # means more data per update rather than more parameters
+            shared_kwargs = {'batch_size': 256, 'capacity': 10000 * num_agents, 'array_memory': True}
+            shared_kwargs.update(agent_kwargs)
+            shared_agent = Agent(input_size=OBSERVATION_SIZE, output_size=3, **shared_kwargs)
+            self.agents = [shared_agent] * num_agents
+            self.replay_memory = shared_agent.memory
+        else:
+            self.agents = [Agent(input_size=OBSERVATION_SIZE, output_size=3, **agent_kwargs) for _ in range(num_agents)] if with_agents else []
+            self.replay_memory = ReplayMemory(10000)
         
-        print(f"Initialized GameSetup with {num_agents} agents")
-        self.loop = asyncio.get_event_loop()
-        self.camera_task = self.loop.create_task(self.async_update_camera())
+        if verbose:
+            print(f"Initialized GameSetup with {num_agents} agents")
+        self.async_camera = async_camera
+        self.camera_task = None
+        if async_camera:
+            self.loop = asyncio.get_event_loop()
+            self.camera_task = self.loop.create_task(self.async_update_camera())
+
+        # Features of every player plus its nearest platforms, see Integration.observations
+        self.observation_builder = ObservationBuilder(num_agents)
+        self.render_platforms = None
+        self.render_platforms_version = None  # platform_manager.version the cached render rows belong to
 
         # Ensure initial platforms and players are set up correctly
         self.initialize_platforms()
         self.initialize_players()
 
+        # Optional batched physics backend that steps all players in one call
+        self.vectorized_physics = vectorized_physics
+        self.physics = None
+        if vectorized_physics:
+            self.physics = VectorizedPhysics(num_agents, self.screen_width, self.screen_height)
+            self.physics.load_players(self.players)
+            self.physics.load_platforms(self.platform_manager.platforms)
+            self.physics_platform_version = self.platform_manager.version
+
+    def unique_agents(self):
+        # Each distinct Agent once, in player order (a shared learner appears once)
+        return list({id(agent): agent for agent in self.agents}.values())
+
     def initialize_platforms(self):
         self.platform_manager.generate_bottom_platform()
         self.platform_manager.generate_additional_platforms()  # Ensure additional platforms are generated
@@ -49,19 +92,26 @@ class GameSetup:
         self.reset_platform_manager()
         self.camera_offset_y = 0  # Reset the camera offset immediately
         self.is_running = True
-        self.camera_task = self.loop.create_task(self.async_update_camera())  # Restart the camera update task
+        if self.async_camera:
+            self.camera_task = self.loop.create_task(self.async_update_camera())  # Restart the camera update task
         
-        print("Game reset complete.")
+        if self.verbose:
+            print("Game reset complete.")
 
     def reset_players(self):
         for player in self.players:
             player.reset()
-        print("Players reset")
+        if self.physics is not None:
+            self.physics.load_players(self.players)
+        if self.verbose:
+            print("Players reset")
 
     def reset_platform_manager(self):
-        self.platform_manager = PlatformManager(self.screen_width, self.screen_height)
+        self.platform_manager.reset()  # Reuses the pooled platform sprites
         self.initialize_platforms()
-        print("Platform manager reset")
+        self.sync_physics_platforms()
+        if self.verbose:
+            print("Platform manager reset")
 
     def get_highest_player_y(self):
         return min(player.rect.top for player in self.players)
@@ -71,38 +121,69 @@ class GameSetup:
         self.camera_offset_y = self.screen_height // 2 - highest_y
 
     def get_state(self, agent_id):
-        state = [self.players[agent_id].rect.centerx, self.players[agent_id].rect.centery, self.players[agent_id].vel_y, self.players[agent_id].is_jumping]
-        platforms = self.platform_manager.platforms.sprites()
+        # One player's observation as a new (1, OBSERVATION_SIZE) tensor
+        row = self.observation_builder.player_row(self.players[agent_id], self.platform_manager)
+        return torch.tensor([row], dtype=torch.float32)
 
-        for i in range(3):
-            if i < len(platforms):
-                platform = platforms[i]
-                state.extend([platform.rect.centerx, platform.rect.centery])
-            else:
-                state.extend([-1, -1])
+    def get_observations(self):
+        """All players' observations, written into one of the builder's two preallocated arrays."""
+        if self.physics is not None:
+            return self.observation_builder.build_physics(self.physics, self.platform_manager)
+        return self.observation_builder.build_players(self.players, self.platform_manager)
 
-        if len(state) != 10:
-            raise ValueError(f"State does not have 10 elements: {state}")
-
-        state_tensor = torch.tensor(state, dtype=torch.float32).view(1, -1)
-        return state_tensor
+    def get_all_states(self):
+        # Zero-copy tensor view of get_observations(); clone rows that must outlive the next build
+        return torch.from_numpy(self.get_observations())
 
     def update_players(self, agent_id, keys):
-        self.players[agent_id].update(keys, self.platform_manager.platforms)
+        self.players[agent_id].update(keys, self.platform_manager)
 
     def check_on_platform(self, agent_id):
-        on_platform = self.players[agent_id].is_on_platform(self.platform_manager.platforms)
+        on_platform = self.players[agent_id].is_on_platform(self.platform_manager)
         return on_platform
 
+    def update_all_players(self, actions):
+        # Vectorized counterpart of update_players for every agent at once
+        self.physics.step(actions)
+        self.physics.store_players(self.players)
+        self.physics.store_platforms(self.platform_manager.platforms)
+
+    def check_all_on_platform(self):
+        return self.physics.is_on_platform()
+
+    def sync_physics_platforms(self):
+        if self.physics is not None and self.physics_platform_version != self.platform_manager.version:
+            self.physics.load_platforms(self.platform_manager.platforms)
+            self.physics_platform_version = self.platform_manager.version
+
     def update_platforms(self):
-        for player in self.players:
-            self.platform_manager.update(player)
+        if self.platform_manager.streaming:
+            highest_y = self.get_highest_player_y()
+            lowest_y = max(player.rect.bottom for player in self.players)
+            self.platform_manager.update_stream(highest_y, lowest_y)
+        else:
+            for player in self.players:
+                self.platform_manager.update(player)
+        self.sync_physics_platforms()
+
+    def platform_sprites(self):
+        # Platforms only change when the manager adds or removes one, so the rows are cached
+        if self.render_platforms_version != self.platform_manager.version:
+            rects = [(p.rect.x, p.rect.y, p.rect.width, p.rect.height, SPRITE_PLATFORM) for p in self.platform_manager.platforms]
+            self.render_platforms = np.array(rects, dtype=np.int32).reshape(-1, SPRITE_FIELDS)
+            self.render_platforms_version = self.platform_manager.version
+        return self.render_platforms
+
+    def player_sprites(self):
+        rects = [(p.rect.x, p.rect.y, p.rect.width, p.rect.height, SPRITE_PLAYER) for p in self.players]
+        return np.array(rects, dtype=np.int32).reshape(-1, SPRITE_FIELDS)
 
     def get_render_data(self, episode, total_reward):
+        """Compact frame for the display: one int32 row (x, y, w, h, sprite id) per sprite,
+        platforms first, plus the HUD values. The display loads the images itself."""
         self.update_camera()  # Ensure camera is updated immediately
         data = {
-            'players': [{'rect': p.rect, 'image': pygame.image.tostring(p.image, 'RGBA')} for p in self.players],
-            'platforms': [{'rect': p.rect, 'image': pygame.image.tostring(p.image, 'RGBA')} for p in self.platform_manager.platforms],
+            'sprites': np.concatenate((self.platform_sprites(), self.player_sprites())),
             'score': sum(player.score for player in self.players),  # Sum of all player scores
             'episode': episode,
             'total_reward': total_reward,
@@ -0,0 +1,86 @@
+"""Train without a display, e.g. on a server:
+
+    python -m Integration.headless --agents 16 --episodes 500 --vectorized-physics --shared-learner
+
+No window is opened, no events are polled and no sprite images are loaded;
+pygame is only used for its Rect/Sprite data structures. Pass --viewer to
+open a display process that shows the newest frame (closing it leaves
+training running).
+"""
+import argparse
+import asyncio
+import multiprocessing
+from ML.inference import BACKENDS, set_torch_threads
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train ClimbSmart agents without a display.")
+    parser.add_argument('--agents', type=int, default=16, help="number of players")
+    parser.add_argument('--episodes', type=int, default=None, help="last episode to run (default: run until interrupted)")
+    parser.add_argument('--max-episode-steps', type=int, default=1200, help="simulation ticks per episode")
+    parser.add_argument('--vectorized-physics', action='store_true', help="step all players with the batched physics")
+    parser.add_argument('--shared-learner', action='store_true', help="one network and replay buffer for all players")
+    parser.add_argument('--array-memory', action='store_true', help="tensor ring-buffer replay memory per agent")
+    parser.add_argument('--train-every', type=int, default=None, help="run gradient updates every N env steps")
+    parser.add_argument('--gradient-steps', type=int, default=1, help="updates per --train-every")
+    parser.add_argument('--background-learner', action='store_true', help="train on a separate thread")
+    parser.add_argument('--replay-dir', default=None, help="incremental replay checkpoints (array memories)")
+    parser.add_argument('--checkpoint-dir', default=None, help="write model checkpoints here")
+    parser.add_argument('--checkpoint-every', type=int, default=10, help="episodes between checkpoints")
+    parser.add_argument('--resume', action='store_true', help="continue from the latest checkpoint")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the per-episode platform layouts")
+    parser.add_argument('--record-dir', default=None, help="save episode recordings here for Integration.recording")
+    parser.add_argument('--record-every', type=int, default=1, help="record every Nth episode")
+    parser.add_argument('--stats-interval', type=float, default=60.0, help="seconds between per-phase timing summaries")
+    parser.add_argument('--stats-path', default=None, help="keep the latest per-phase timing summary in this JSON file")
+    parser.add_argument('--stats-port', type=int, default=None, help="serve the timing summary on http://127.0.0.1:PORT/")
+    parser.add_argument('--profile-episodes', type=int, default=0, help="cProfile the first N episodes")
+    parser.add_argument('--profile-dir', default='profiles', help="where --profile-episodes dumps .prof files")
+    parser.add_argument('--inference-backend', choices=BACKENDS, default='eager', help="how actors run the networks")
+    parser.add_argument('--torch-threads', type=int, default=None, help="torch intra-op threads (default: torch's choice)")
+    parser.add_argument('--interop-threads', type=int, default=None, help="torch inter-op threads")
+    parser.add_argument('--no-metrics', action='store_true', help="disable TensorBoard logging")
+    parser.add_argument('--viewer', action='store_true', help="open a window showing the training")
+    parser.add_argument('--render-every', type=int, default=1, help="ticks between frames sent to the viewer")
+    parser.add_argument('--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_torch_threads(args.torch_threads, args.interop_threads)
+    from .training_loop import TrainingLoop
+    from .frame_channel import FrameChannel
+
+    frame_channel = None
+    viewer = None
+    if args.viewer:
+        from Game.game import run_viewer
+        frame_channel = FrameChannel()
+        viewer = multiprocessing.Process(target=run_viewer, args=(frame_channel,), daemon=True)
+        viewer.start()
+
+    agent_kwargs = {'array_memory': True} if args.array_memory else None
+    training_loop = TrainingLoop(args.agents, frame_channel, verbose=args.verbose, vectorized_physics=args.vectorized_physics,
+                                 realtime=False, max_episode_steps=args.max_episode_steps,
+                                 render_every=args.render_every if args.viewer else 0, agent_kwargs=agent_kwargs,
+                                 replay_dir=args.replay_dir, shared_learner=args.shared_learner, train_every=args.train_every,
+                                 gradient_steps=args.gradient_steps, background_learner=args.background_learner,
+                                 checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every, resume=args.resume,
+                                 metrics=not args.no_metrics, headless=True, max_episodes=args.episodes, seed=args.seed,
+                                 record_dir=args.record_dir, record_every=args.record_every, stats_interval=args.stats_interval,
+                                 stats_path=args.stats_path, stats_port=args.stats_port, profile_episodes=args.profile_episodes,
+                                 profile_dir=args.profile_dir, inference_backend=args.inference_backend)
+    try:
+        asyncio.run(training_loop.run_game())
+    except KeyboardInterrupt:
+        print("Interrupted by user.")
+    finally:
+        if viewer is not None:
+            viewer.terminate()
+            viewer.join()
+            frame_channel.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import threading
+
+
+class MetricsLogger:
+    """Drop-in for SummaryWriter.add_scalar that aggregates in memory.
+
+    Values are collected per (tag, step) and written as mean/min/max once
+    per flush_interval seconds by a background thread, through a single
+    SummaryWriter per run. A scalar logged once per step (e.g. per episode)
+    is written unchanged as one point; only repeated values for the same
+    step, like the per-frame rewards of an episode, are aggregated. With enabled=False every call is a no-op and
+    TensorBoard is never imported.
+    """
+
+    def __init__(self, log_dir='runs/ClimbSmart', flush_interval=10.0, enabled=True):
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.writer = None
+        self.windows = {}  # (tag, step) -> [count, total, min, max]
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.flusher = None
+        if enabled:
+            self.flusher = threading.Thread(target=self.flush_loop, daemon=True)
+            self.flusher.start()
+
+    def add_scalar(self, tag, value, step=None):
+        if not self.enabled:
+            return
+        value = float(value)
+        with self.lock:
+            window = self.windows.get((tag, step))
+            if window is None:
+                self.windows[tag, step] = [1, value, value, value]
+            else:
+                window[0] += 1
+                window[1] += value
+                window[2] = min(window[2], value)
+                window[3] = max(window[3], value)
+
+    def add_values(self, tag, values, step=None):
+        """Aggregate a batch of values (e.g. one reward per agent) in one call."""
+        if not self.enabled or len(values) == 0:
+            return
+        values = [float(value) for value in values]
+        with self.lock:
+            window = self.windows.setdefault((tag, step), [0, 0.0, values[0], values[0]])
+            window[0] += len(values)
+            window[1] += sum(values)
+            window[2] = min(window[2], min(values))
+            window[3] = max(window[3], max(values))
+
+    def flush(self):
+        if not self.enabled:
+            return
+        with self.lock:
+            windows, self.windows = self.windows, {}
+        if not windows:
+            return
+        if self.writer is None:
+            from torch.utils.tensorboard import SummaryWriter
+            self.writer = SummaryWriter(self.log_dir)
+        for (tag, step), (count, total, minimum, maximum) in windows.items():
+            self.writer.add_scalar(tag, total / count, step)
+            if count > 1:
+                self.writer.add_scalar(f'{tag}/min', minimum, step)
+                self.writer.add_scalar(f'{tag}/max', maximum, step)
+        self.writer.flush()
+
+    def flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Exception flushing metrics: {e}")
+
+    def close(self):
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        if self.flusher is not None:
+            self.flusher.join()
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,108 @@
+import bisect
+import numpy as np
+
+# Nearest platforms described per player: K_ABOVE above it, K_BELOW below (or level with) it
+K_ABOVE = 2
+K_BELOW = 1
+PLAYER_FEATURES = 4  # centerx, centery, vel_y, is_jumping
+OBSERVATION_SIZE = PLAYER_FEATURES + 2 * (K_ABOVE + K_BELOW)
+
+
+class ObservationBuilder:
+    """Writes every player's features into preallocated float32 arrays.
+
+    Each row is (centerx, centery, vel_y, is_jumping) followed by the
+    (centerx, centery) of the k_above nearest platforms above the player,
+    nearest first, then the k_below nearest below it; missing platforms
+    are (-1, -1). Platform centres are kept sorted by height and only
+    rebuilt when the platform manager's version changes, so finding the
+    neighbours is one searchsorted over all players.
+
+    Two buffers are used in turn: the array returned by a build stays valid
+    through the next build, so a post-step observation can be reused as the
+    next pre-step observation while the following one is written.
+    """
+
+    def __init__(self, num_agents, k_above=K_ABOVE, k_below=K_BELOW):
+        self.k_above = k_above
+        self.k_below = k_below
+        self.observation_size = PLAYER_FEATURES + 2 * (k_above + k_below)
+        self.buffers = [np.zeros((num_agents, self.observation_size), dtype=np.float32) for _ in range(2)]
+        self.current = 0
+        self.platform_version = None
+        self.platform_x = np.zeros(0, dtype=np.float32)
+        self.platform_y = np.zeros(0, dtype=np.float32)
+        self.platform_x_list, self.platform_y_list = [], []  # Same values, for single-player lookups
+        # Offsets from the split point: above are the rows just before it, below the rows from it on
+        self.above_offsets = -1 - np.arange(k_above)
+        self.below_offsets = np.arange(k_below)
+
+    def sync_platforms(self, platform_manager):
+        if self.platform_version == platform_manager.version:
+            return
+        entries = platform_manager.index.entries
+        x = np.array([platform.rect.centerx for platform in entries], dtype=np.float32)
+        y = np.array([platform.rect.centery for platform in entries], dtype=np.float32)
+        order = np.argsort(y, kind='stable')  # The index is sorted by top; centres matter here
+        self.platform_x, self.platform_y = x[order], y[order]
+        self.platform_x_list, self.platform_y_list = self.platform_x.tolist(), self.platform_y.tolist()
+        self.platform_version = platform_manager.version
+
+    def write_platforms(self, out, centery, offsets, column):
+        count = len(self.platform_y)
+        split = np.searchsorted(self.platform_y, centery, side='left')  # Rows before it are above the player
+        rows = split[:, None] + offsets
+        valid = (rows >= 0) & (rows < count)
+        rows = rows.clip(0, max(count - 1, 0))
+        width = len(offsets)
+        if count:
+            out[:, column:column + 2 * width:2] = np.where(valid, self.platform_x[rows], -1)
+            out[:, column + 1:column + 2 * width:2] = np.where(valid, self.platform_y[rows], -1)
+        else:
+            out[:, column:column + 2 * width] = -1
+
+    def write(self, out, centerx, centery, vel_y, is_jumping, platform_manager):
+        self.sync_platforms(platform_manager)
+        out[:, 0] = centerx
+        out[:, 1] = centery
+        out[:, 2] = vel_y
+        out[:, 3] = is_jumping
+        centery = np.asarray(centery, dtype=np.float32)
+        self.write_platforms(out, centery, self.above_offsets, PLAYER_FEATURES)
+        self.write_platforms(out, centery, self.below_offsets, PLAYER_FEATURES + 2 * self.k_above)
+        return out
+
+    def next_buffer(self):
+        self.current ^= 1
+        return self.buffers[self.current]
+
+    def build_physics(self, physics, platform_manager):
+        """All agents' observations from a VectorizedPhysics, without touching the sprites."""
+        return self.write(self.next_buffer(), physics.centerx, physics.centery, physics.vel_y, physics.is_jumping,
+                          platform_manager)
+
+    def build_players(self, players, platform_manager):
+        return self.write(self.next_buffer(), *self.player_columns(players), platform_manager)
+
+    def observe(self, players, platform_manager):
+        """Observations for a few players in a new array (not one of the shared buffers)."""
+        out = np.zeros((len(players), self.observation_size), dtype=np.float32)
+        return self.write(out, *self.player_columns(players), platform_manager)
+
+    def player_row(self, player, platform_manager):
+        """One player's observation as a list; bisect is cheaper than numpy for a single row."""
+        self.sync_platforms(platform_manager)
+        xs, ys = self.platform_x_list, self.platform_y_list
+        rect = player.rect
+        split = bisect.bisect_left(ys, rect.centery)
+        row = [rect.centerx, rect.centery, player.vel_y, player.is_jumping]
+        for i in range(split - 1, split - 1 - self.k_above, -1):
+            row += (xs[i], ys[i]) if i >= 0 else (-1, -1)
+        for i in range(split, split + self.k_below):
+            row += (xs[i], ys[i]) if i < len(ys) else (-1, -1)
+        return row
+
+    @staticmethod
+    def player_columns(players):
+        return ([player.rect.centerx for player in players], [player.rect.centery for player in players],
+                [player.vel_y for player in players], [player.is_jumping for player in players])
@@ -0,0 +1,159 @@
+import cProfile
+import http.server
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import numpy as np
+
+# Histogram bucket edges in microseconds: 1, 2, 4, ... ~1 s
+HISTOGRAM_EDGES_US = 2.0 ** np.arange(0, 21)
+
+
+class PhaseTimer:
+    """Rolling per-phase timings for the training loop's hot path.
+
+    Callers wrap a phase as `start = timer.start(); ...; timer.stop('physics', start)`.
+    The last `window` durations of each phase are kept in a ring buffer;
+    summary() turns them into percentiles and a log2 histogram. With
+    enabled=False both calls return immediately.
+
+    Every `interval` seconds report() prints the summary, writes it as JSON
+    to stats_path and serves it on http://127.0.0.1:<stats_port>/ when
+    those are set; interval=None only reports on close().
+    """
+
+    def __init__(self, enabled=True, window=4096, interval=60.0, stats_path=None, stats_port=None):
+        self.enabled = enabled
+        self.window = window
+        self.interval = interval
+        self.stats_path = stats_path
+        self.samples = {}  # phase -> ring buffer of seconds
+        self.counts = {}  # phase -> samples ever added
+        self.totals = {}  # phase -> seconds ever spent
+        self.last_report = time.perf_counter()
+        self.latest = {}
+        self.server = None
+        if enabled and stats_port is not None:
+            self.start_server(stats_port)
+
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, phase, start):
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - start
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = np.zeros(self.window)
+            self.counts[phase] = 0
+            self.totals[phase] = 0.0
+        samples[self.counts[phase] % self.window] = elapsed
+        self.counts[phase] += 1
+        self.totals[phase] += elapsed
+
+    def summary(self):
+        grand_total = sum(self.totals.values()) or 1.0
+        phases = {}
+        for phase, samples in self.samples.items():
+            window = samples[:min(self.counts[phase], self.window)] * 1e6  # Microseconds
+            p50, p90, p99 = np.percentile(window, [50, 90, 99])
+            histogram, _ = np.histogram(window, bins=HISTOGRAM_EDGES_US)
+            phases[phase] = {
+                'count': self.counts[phase],
+                'total_s': self.totals[phase],
+                'share': self.totals[phase] / grand_total,
+                'mean_us': float(window.mean()),
+                'p50_us': float(p50),
+                'p90_us': float(p90),
+                'p99_us': float(p99),
+                'max_us': float(window.max()),
+                'histogram_us': {f"<{int(edge)}": int(count) for edge, count in zip(HISTOGRAM_EDGES_US[1:], histogram) if count},
+            }
+        return {'time': time.time(), 'window': self.window, 'phases': phases}
+
+    def report(self, force=False):
+        if not self.enabled or not self.samples:
+            return
+        now = time.perf_counter()
+        if not force and (self.interval is None or now - self.last_report < self.interval):
+            return
+        self.last_report = now
+        self.latest = self.summary()
+        print(self.format(self.latest))
+        if self.stats_path:
+            tmp_path = self.stats_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.latest, f, indent=2)
+            os.replace(tmp_path, self.stats_path)
+
+    @staticmethod
+    def format(summary):
+        lines = [f"{'phase':>10} {'share':>6} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9}  (us)"]
+        phases = sorted(summary['phases'].items(), key=lambda item: -item[1]['share'])
+        for phase, stats in phases:
+            lines.append(f"{phase:>10} {stats['share']:6.1%} {stats['mean_us']:9.1f} {stats['p50_us']:9.1f} "
+                         f"{stats['p90_us']:9.1f} {stats['p99_us']:9.1f}")
+        return '\n'.join(lines)
+
+    def start_server(self, port):
+        timer = self
+
+        class StatsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(timer.latest).encode()  # Last report(); the ring buffers belong to the training thread
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the training output clean
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', port), StatsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Phase stats served on http://127.0.0.1:{self.server.server_address[1]}/")
+
+    def close(self):
+        self.report(force=True)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class EpisodeProfiler:
+    """cProfile switch: profiles the first `episodes` episodes it is asked about and dumps each to directory."""
+
+    def __init__(self, episodes=0, directory='profiles', verbose=False):
+        self.remaining = episodes
+        self.directory = directory
+        self.verbose = verbose
+        self.profile = None
+        self.episode = None
+
+    def start(self, episode):
+        if self.remaining <= 0:
+            return
+        self.remaining -= 1
+        self.episode = episode
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self):
+        if self.profile is None:
+            return
+        self.profile.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"episode_{self.episode:06d}.prof")
+        self.profile.dump_stats(path)  # Open with pstats or snakeviz
+        print(f"Saved profile '{path}'")
+        if self.verbose:
+            output = io.StringIO()
+            pstats.Stats(self.profile, stream=output).sort_stats('cumulative').print_stats(15)
+            print(output.getvalue())
+        self.profile = None
@@ -0,0 +1,264 @@
+"""Episode recordings: a seed, packed actions and a few state snapshots per episode.
+
+Record from training with TrainingLoop(record_dir=...), then replay offline:
+
+    python -m Integration.recording recordings/episode_000012.npz --speed 4 --start 600
+
+Replay controls: space pauses, left/right seek 5 seconds, up/down change speed.
+"""
+import argparse
+import json
+import os
+import random
+import numpy as np
+
+FORMAT_VERSION = 1
+ACTIONS_PER_BYTE = 4  # Actions are 0..2, so two bits each
+FRAME_RATE = 60  # Simulation ticks per second of game time
+
+
+def pack_actions(actions):
+    flat = np.asarray(actions, dtype=np.uint8).reshape(-1)
+    padded = np.zeros(-(-len(flat) // ACTIONS_PER_BYTE) * ACTIONS_PER_BYTE, dtype=np.uint8)
+    padded[:len(flat)] = flat
+    groups = padded.reshape(-1, ACTIONS_PER_BYTE)
+    return groups[:, 0] | groups[:, 1] << 2 | groups[:, 2] << 4 | groups[:, 3] << 6
+
+
+def unpack_actions(packed, frames, num_agents):
+    packed = np.asarray(packed, dtype=np.uint8)
+    flat = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1).reshape(-1)
+    return flat[:frames * num_agents].reshape(frames, num_agents)
+
+
+def capture_state(game_setup):
+    """Everything the simulation needs to continue from here: players, platforms and the layout RNG.
+
+    Player rows are (left, top, vel_y, is_jumping, highest_y, score, high_score)."""
+    players = np.array([[player.rect.left, player.rect.top, player.vel_y, player.is_jumping, player.highest_y,
+                         player.score, player.high_score] for player in game_setup.players], dtype=np.float64)
+    platform_manager = game_setup.platform_manager
+    sprites = platform_manager.platforms.sprites()
+    platforms = np.array([(p.rect.centerx, p.rect.centery, p.rect.width, p.rect.height) for p in sprites],
+                         dtype=np.int32).reshape(-1, 4)
+    last_platform = sprites.index(platform_manager.last_platform) if platform_manager.last_platform in sprites else -1
+    version, internal, gauss_next = platform_manager.random.getstate()
+    rng = np.array((version,) + internal, dtype=np.int64)
+    return {'players': players, 'platforms': platforms, 'last_platform': last_platform, 'rng': rng,
+            'gauss_next': np.nan if gauss_next is None else gauss_next}
+
+
+def restore_state(game_setup, state):
+    for player, row in zip(game_setup.players, state['players']):
+        player.rect.left, player.rect.top = int(row[0]), int(row[1])
+        player.vel_y = float(row[2])
+        player.is_jumping = bool(row[3])
+        player.highest_y, player.score, player.high_score = int(row[4]), int(row[5]), int(row[6])
+
+    platform_manager = game_setup.platform_manager
+    for platform in list(platform_manager.index.entries):
+        platform_manager.recycle_platform(platform)
+    platforms = []
+    for centerx, centery, width, height in state['platforms'].tolist():
+        platform = platform_manager.create_platform(centerx, centery, width, height)
+        platform_manager.add_platform(platform)  # Same group order as when captured
+        platforms.append(platform)
+    platform_manager.last_platform = platforms[state['last_platform']] if state['last_platform'] >= 0 else None
+    gauss_next = None if np.isnan(state['gauss_next']) else float(state['gauss_next'])
+    rng = state['rng'].tolist()
+    if not isinstance(platform_manager.random, random.Random):
+        platform_manager.random = random.Random()
+    platform_manager.random.setstate((rng[0], tuple(rng[1:]), gauss_next))
+
+    if game_setup.physics is not None:
+        game_setup.physics.load_players(game_setup.players)
+    game_setup.sync_physics_platforms()
+
+
+class EpisodeRecorder:
+    """Logs one episode's actions as the game runs; save() writes it as a compressed .npz.
+
+    The state at frame 0 is always captured, and again every snapshot_every
+    frames if set (0 disables the periodic ones). record() only copies the
+    tick's actions into a growing uint8 array.
+    """
+
+    def __init__(self, game_setup, episode, snapshot_every=300, initial_frames=1200):
+        self.game_setup = game_setup
+        self.episode = episode
+        self.snapshot_every = snapshot_every
+        self.actions = np.zeros((initial_frames, game_setup.num_agents), dtype=np.uint8)
+        self.frames = 0
+        self.snapshots = {0: capture_state(game_setup)}
+
+    def record(self, actions):
+        if self.frames == len(self.actions):
+            self.actions = np.concatenate((self.actions, np.zeros_like(self.actions)))
+        self.actions[self.frames] = actions
+        self.frames += 1
+        if self.snapshot_every and self.frames % self.snapshot_every == 0:
+            self.snapshots[self.frames] = capture_state(self.game_setup)
+
+    def save(self, path):
+        game_setup = self.game_setup
+        header = {
+            'version': FORMAT_VERSION,
+            'episode': self.episode,
+            'seed': game_setup.platform_manager.seed,
+            'num_agents': game_setup.num_agents,
+            'frames': self.frames,
+            'streaming': game_setup.platform_manager.streaming,
+            'screen_width': game_setup.screen_width,
+            'screen_height': game_setup.screen_height,
+            'snapshot_every': self.snapshot_every,
+        }
+        frames = sorted(self.snapshots)
+        snapshots = [self.snapshots[frame] for frame in frames]
+        platform_counts = [len(snapshot['platforms']) for snapshot in snapshots]
+        arrays = {
+            'header': np.frombuffer(json.dumps(header).encode(), dtype=np.uint8),
+            'actions': pack_actions(self.actions[:self.frames]),
+            'snapshot_frames': np.array(frames, dtype=np.int64),
+            'snapshot_players': np.stack([snapshot['players'] for snapshot in snapshots]),
+            'snapshot_platform_counts': np.array(platform_counts, dtype=np.int64),
+            'snapshot_platforms': np.concatenate([snapshot['platforms'] for snapshot in snapshots]),
+            'snapshot_last_platform': np.array([snapshot['last_platform'] for snapshot in snapshots], dtype=np.int64),
+            'snapshot_rng': np.stack([snapshot['rng'] for snapshot in snapshots]),
+            'snapshot_gauss_next': np.array([snapshot['gauss_next'] for snapshot in snapshots], dtype=np.float64),
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+
+def load_recording(path):
+    with np.load(path) as data:
+        header = json.loads(data['header'].tobytes().decode())
+        actions = unpack_actions(data['actions'], header['frames'], header['num_agents'])
+        offsets = np.concatenate(([0], np.cumsum(data['snapshot_platform_counts'])))
+        snapshots = {}
+        for i, frame in enumerate(data['snapshot_frames'].tolist()):
+            snapshots[frame] = {
+                'players': data['snapshot_players'][i],
+                'platforms': data['snapshot_platforms'][offsets[i]:offsets[i + 1]],
+                'last_platform': int(data['snapshot_last_platform'][i]),
+                'rng': data['snapshot_rng'][i],
+                'gauss_next': float(data['snapshot_gauss_next'][i]),
+            }
+    return header, actions, snapshots
+
+
+class EpisodeReplayer:
+    """Deterministically re-simulates a recording with the batched physics.
+
+    seek() restores the nearest snapshot at or before the target frame and
+    steps forward from there. Whenever playback reaches a recorded snapshot
+    the players are compared with it; the first mismatch is kept in
+    desync_frame.
+    """
+
+    def __init__(self, path, headless=True):
+        from .game_setup import GameSetup
+        self.path = path
+        self.header, self.actions, self.snapshots = load_recording(path)
+        self.frames = self.header['frames']
+        self.num_agents = self.header['num_agents']
+        self.game_setup = GameSetup(self.num_agents, vectorized_physics=True, streaming=self.header['streaming'],
+                                    seed=self.header['seed'], headless=headless, with_agents=False,
+                                    async_camera=False, verbose=False)
+        self.frame = None  # Nothing restored yet
+        self.desync_frame = None
+        self.seek(0)
+
+    def step(self):
+        if self.frame >= self.frames:
+            return False
+        self.game_setup.update_all_players(self.actions[self.frame].tolist())
+        self.game_setup.update_platforms()
+        self.frame += 1
+        snapshot = self.snapshots.get(self.frame)
+        if snapshot is not None and self.desync_frame is None:
+            if not np.array_equal(capture_state(self.game_setup)['players'], snapshot['players']):
+                self.desync_frame = self.frame
+                print(f"Replay of '{self.path}' diverged from the recording at frame {self.frame}")
+        return True
+
+    def seek(self, frame):
+        frame = max(0, min(frame, self.frames))
+        start = max(snapshot_frame for snapshot_frame in self.snapshots if snapshot_frame <= frame)
+        if self.frame is None or frame < self.frame or start > self.frame:
+            restore_state(self.game_setup, self.snapshots[start])
+            self.frame = start
+        while self.frame < frame:
+            self.step()
+
+    def render_data(self):
+        return self.game_setup.get_render_data(self.header['episode'], 0)
+
+    def play(self, speed=1.0, start=0):
+        """Show the replay in a window, speed times faster than real time."""
+        import pygame
+        from Game.game import open_display
+        from Game.graphics import GraphicsHandler
+        screen = open_display(self.header['screen_width'], self.header['screen_height'])
+        graphics = GraphicsHandler(screen)
+        clock = pygame.time.Clock()
+        self.seek(start)
+        paused = False
+        pending = 0.0  # Fractional frames owed at non-integer speeds
+        running = True
+        try:
+            while running:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE:
+                            paused = not paused
+                        elif event.key == pygame.K_RIGHT:
+                            self.seek(self.frame + 5 * FRAME_RATE)
+                        elif event.key == pygame.K_LEFT:
+                            self.seek(self.frame - 5 * FRAME_RATE)
+                        elif event.key == pygame.K_UP:
+                            speed *= 2
+                        elif event.key == pygame.K_DOWN:
+                            speed /= 2
+                if not paused:
+                    pending += speed
+                    while pending >= 1 and self.step():
+                        pending -= 1
+                    if self.frame >= self.frames:
+                        pending = 0.0
+                pygame.display.set_caption(f"ClimbSmart replay - frame {self.frame}/{self.frames} - {speed:g}x"
+                                           f"{' (paused)' if paused else ''}")
+                pygame.display.update(graphics.render(self.render_data(), clock.get_time()))
+                clock.tick(FRAME_RATE)
+        finally:
+            pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded ClimbSmart episode.")
+    parser.add_argument('recording', help=".npz file written by EpisodeRecorder")
+    parser.add_argument('--speed', type=float, default=1.0, help="playback speed, 1 = real time")
+    parser.add_argument('--start', type=int, default=0, help="first frame to show")
+    parser.add_argument('--verify', action='store_true', help="re-simulate without a window and check the snapshots")
+    args = parser.parse_args(argv)
+
+    replayer = EpisodeReplayer(args.recording, headless=args.verify)
+    header = replayer.header
+    print(f"Episode {header['episode']}: {header['frames']} frames, {header['num_agents']} players, seed {header['seed']}, "
+          f"{len(replayer.snapshots)} snapshots")
+    if args.verify:
+        replayer.seek(replayer.frames)
+        print("Replay matches the recording" if replayer.desync_frame is None else f"Diverged at frame {replayer.desync_frame}")
+        return
+    replayer.play(speed=args.speed, start=args.start)
+
+
+if __name__ == "__main__":
+    main()
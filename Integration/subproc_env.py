@@ -0,0 +1,130 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from .climb_env import ClimbVecEnv, OBSERVATION_SIZE, NUM_ACTIONS
+
+
+def _buffer_views(blocks, num_agents):
+    # The views are only valid while the blocks stay open
+    obs = np.ndarray((num_agents, OBSERVATION_SIZE), dtype=np.float32, buffer=blocks[0].buf)
+    rewards = np.ndarray((num_agents,), dtype=np.float32, buffer=blocks[1].buf)
+    dones = np.ndarray((num_agents,), dtype=bool, buffer=blocks[2].buf)
+    return obs, rewards, dones
+
+
+def _worker(remote, parent_remote, buffer_names, total_agents, agent_offset, env_seeds, agents_per_env, max_steps, streaming):
+    parent_remote.close()
+    blocks = [shared_memory.SharedMemory(name=name) for name in buffer_names]
+    obs, rewards, dones = _buffer_views(blocks, total_agents)
+    envs = [ClimbVecEnv(agents_per_env, max_steps=max_steps, seed=seed, streaming=streaming) for seed in env_seeds]
+    slices = [slice(agent_offset + i * agents_per_env, agent_offset + (i + 1) * agents_per_env) for i in range(len(envs))]
+
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == 'step':
+                infos = []
+                for env, agents, actions in zip(envs, slices, np.split(data, len(envs))):
+                    obs[agents], rewards[agents], dones[agents], info = env.step(actions)
+                    infos.append(info)
+                remote.send(infos)
+            elif cmd == 'reset':
+                for env, agents in zip(envs, slices):
+                    obs[agents] = env.reset()
+                remote.send(None)
+            elif cmd == 'close':
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for env in envs:
+            env.close()
+        del obs, rewards, dones
+        for block in blocks:
+            block.close()
+        remote.close()
+
+
+class SubprocClimbVecEnv:
+    """Runs num_envs ClimbVecEnv worlds spread over num_workers processes.
+
+    Workers write observations, rewards and dones straight into shared memory,
+    so the arrays returned by reset()/step_wait() are zero-copy views that are
+    overwritten by the next step; copy them if they must be kept. Only actions
+    and commands travel over the pipes. Agents are laid out env by env, so
+    agent j of env i is row i * agents_per_env + j.
+    """
+
+    def __init__(self, num_envs, agents_per_env, num_workers=None, max_steps=1200, seed=None, streaming=True):
+        self.num_envs = num_envs
+        self.agents_per_env = agents_per_env
+        self.num_agents = num_envs * agents_per_env
+        self.num_workers = min(num_workers or multiprocessing.cpu_count(), num_envs)
+        self.observation_size = OBSERVATION_SIZE
+        self.num_actions = NUM_ACTIONS
+        self.waiting = False
+        self.closed = False
+
+        sizes = [self.num_agents * OBSERVATION_SIZE * 4, self.num_agents * 4, self.num_agents]
+        self.blocks = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        self.observations, self.rewards, self.dones = _buffer_views(self.blocks, self.num_agents)
+
+        # Contiguous shard of environments per worker
+        shards = np.array_split(np.arange(num_envs), self.num_workers)
+        self.agent_slices = []
+        self.remotes = []
+        self.processes = []
+        for shard in shards:
+            start, stop = shard[0] * agents_per_env, (shard[-1] + 1) * agents_per_env
+            env_seeds = [seed + int(i) if seed is not None else None for i in shard]
+            remote, work_remote = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(work_remote, remote, [block.name for block in self.blocks], self.num_agents,
+                      start, env_seeds, agents_per_env, max_steps, streaming),
+                daemon=True)
+            process.start()
+            work_remote.close()
+            self.agent_slices.append(slice(start, stop))
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+    def reset(self):
+        for remote in self.remotes:
+            remote.send(('reset', None))
+        for remote in self.remotes:
+            remote.recv()
+        return self.observations
+
+    def step_async(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_agents)
+        for remote, agents in zip(self.remotes, self.agent_slices):
+            remote.send(('step', actions[agents]))
+        self.waiting = True
+
+    def step_wait(self):
+        infos = []
+        for remote in self.remotes:
+            infos.extend(remote.recv())  # One info dict per environment
+        self.waiting = False
+        return self.observations, self.rewards, self.dones, infos
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        del self.observations, self.rewards, self.dones
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.closed = True
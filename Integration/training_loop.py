@@ -1,118 +1,363 @@
+import os
+import random
 import time
 import asyncio
+import numpy as np
 import torch
 import pygame
 from .game_ai_integrations import GameAIIntegrations
 from .game_setup import GameSetup
 from .utilities import handle_events
+from .metrics import MetricsLogger
+from .recording import EpisodeRecorder
+from .profiling import PhaseTimer, EpisodeProfiler
+from ML.memory import ArrayReplayMemory
+from ML.replay_storage import ReplayStorage
+from ML.batched_policy import BatchedPolicy
+from ML.learner import BackgroundLearner
+from ML.checkpoint import CheckpointManager
 
 class TrainingLoop:
-    def __init__(self, num_agents, queues, verbose=False):
+    def __init__(self, num_agents, queues, verbose=False, vectorized_physics=False, realtime=True,
+                 max_episode_steps=1200, render_every=1, agent_kwargs=None, replay_dir=None, shared_learner=False,
+                 train_every=None, gradient_steps=1, background_learner=False, publish_every=100,
+                 max_train_ratio=None, checkpoint_dir=None, checkpoint_every=10, keep_checkpoints=3, resume=False,
+                 metrics=True, metrics_flush_interval=10.0, headless=False, max_episodes=None, seed=None,
+                 record_dir=None, record_every=1, snapshot_every=300, phase_timing=True, stats_interval=60.0,
+                 stats_path=None, stats_port=None, profile_episodes=0, profile_dir='profiles',
+                 inference_backend='eager'):
         self.num_agents = num_agents
+        # Where frames go: a FrameChannel (latest-frame slot read by the display process),
+        # or a list of multiprocessing queues as before
         self.queues = queues
         self.verbose = verbose
-        self.max_episode_duration = 20  # Maximum duration in seconds
-        self.clock = pygame.time.Clock()  # Define a clock object
+        self.vectorized_physics = vectorized_physics
+        # realtime=True paces frames at ~60 FPS and ends episodes on wall-clock time (for watching).
+        # realtime=False fast-forwards: episodes last max_episode_steps simulation ticks and
+        # the loop never sleeps.
+        self.realtime = realtime
+        self.max_episode_duration = 20  # Maximum duration in seconds (realtime mode)
+        self.max_episode_steps = max_episode_steps  # Maximum ticks per episode (fast-forward mode)
+        self.render_every = render_every  # Push render data every N ticks, 0 disables it
+        self.total_steps = 0
+        self.agent_kwargs = agent_kwargs
+        self.replay_dir = replay_dir  # Incremental on-disk replay checkpoints for array-backed memories
+        self.replay_storages = []
+        self.shared_learner = shared_learner  # All players act through one Agent
+        # Update cadence: with train_every=N, run gradient_steps updates every N env steps.
+        # Without it, each learner gets a single update at the end of the episode.
+        self.train_every = train_every
+        self.gradient_steps = gradient_steps
+        self.total_grad_steps = 0
+        # Actor/learner split: a thread per learner trains continuously and publishes
+        # weights to the actors every publish_every updates
+        self.background_learner = background_learner
+        self.publish_every = publish_every
+        self.max_train_ratio = max_train_ratio
+        self.background_learners = []
+        self.inference_backend = inference_backend  # How the batched policy runs the networks, see ML.inference
+        # Periodic snapshots of networks, optimizers and epsilon; resume=True continues from the latest
+        self.checkpoints = CheckpointManager(checkpoint_dir, keep_last=keep_checkpoints, save_every=checkpoint_every) if checkpoint_dir else None
+        self.resume = resume
+        # One aggregating TensorBoard logger per run; metrics=False turns logging off (benchmarks)
+        self.metrics = MetricsLogger('runs/ClimbSmart', flush_interval=metrics_flush_interval, enabled=metrics)
+        # headless=True: no sprite images, no event polling and no pygame clock (servers without a display)
+        self.headless = headless
+        self.clock = pygame.time.Clock() if not headless else None  # Define a clock object
+        self.max_episodes = max_episodes  # Last episode number to run (continues across resume), None runs until interrupted
+        # Episode recordings (seed + packed actions + snapshots) for offline replay, see Integration.recording.
+        # Each episode's platform layout gets its own seed, drawn from Random(seed), so it can be rebuilt.
+        self.record_dir = record_dir
+        self.record_every = record_every
+        self.snapshot_every = snapshot_every
+        self.recorder = None
+        self.layout_random = random.Random(seed) if seed is not None or record_dir else None
+        self.tick_actions = np.zeros(num_agents, dtype=np.uint8)
+        # Per-phase frame timings (summary every stats_interval seconds, None for only at the end, optional
+        # JSON file and localhost endpoint) and a cProfile dump for the first profile_episodes episodes
+        self.timer = PhaseTimer(enabled=phase_timing, interval=stats_interval, stats_path=stats_path, stats_port=stats_port)
+        self.profiler = EpisodeProfiler(profile_episodes, profile_dir, verbose=verbose)
         self.episode = 1  # Ensure episode is initialized here
+        # Post-step observations, reused as the next tick's pre-step observations
+        self.states = None
+        self.agent_states = [None] * num_agents
         self.initialize_game()
 
     def initialize_game(self):
         print("Initializing game setup...")
-        self.game_setup = GameSetup(self.num_agents)
-        self.ai_integrations = [GameAIIntegrations(agent, self.game_setup.replay_memory) for agent in self.game_setup.agents]
+        self.game_setup = GameSetup(self.num_agents, vectorized_physics=self.vectorized_physics, async_camera=self.realtime,
+                                    seed=self.next_layout_seed(), headless=self.headless, agent_kwargs=self.agent_kwargs, shared_learner=self.shared_learner)
+        self.learners = self.game_setup.unique_agents()
+        self.ai_integrations = self.create_ai_integrations()
+        self.policy = BatchedPolicy(self.game_setup.agents, self.inference_backend)
         self.load_replay_memory()
+        if self.checkpoints and self.resume:
+            saved_episode = self.checkpoints.load(self.learners)
+            if saved_episode is not None:
+                self.episode = saved_episode + 1
+        if self.background_learner:
+            self.start_background_learners()
         if self.verbose:
             print(f"Game initialized with {self.num_agents} agents.")
         # Initial display update to ensure the first frame is drawn correctly
         self.update_display(self.episode, 0)
 
+    def next_layout_seed(self):
+        # None keeps the unseeded layouts from the global random module
+        return self.layout_random.randrange(2 ** 31) if self.layout_random else None
+
+    def start_recording(self, episode):
+        if self.record_dir and self.record_every and episode % self.record_every == 0:
+            self.recorder = EpisodeRecorder(self.game_setup, episode, snapshot_every=self.snapshot_every,
+                                            initial_frames=self.max_episode_steps)
+        else:
+            self.recorder = None
+
+    def save_recording(self):
+        if self.recorder is None:
+            return
+        path = os.path.join(self.record_dir, f"episode_{self.recorder.episode:06d}.npz")
+        try:
+            self.recorder.save(path)
+            if self.verbose:
+                print(f"Saved recording '{path}'")
+        except Exception as e:
+            print(f"Error saving recording '{path}': {e}")
+        self.recorder = None
+
+    def start_background_learners(self):
+        for agent in self.learners:
+            learner = BackgroundLearner(agent, publish_every=self.publish_every, max_train_ratio=self.max_train_ratio)
+            learner.start()
+            self.background_learners.append(learner)
+        print(f"Started {len(self.background_learners)} background learner(s)")
+
+    def stop_background_learners(self):
+        for learner in self.background_learners:
+            learner.stop()
+        self.background_learners = []
+
+    def create_ai_integrations(self):
+        # Epsilon decays once per frame per distinct agent, even when players share one
+        seen = set()
+        ai_integrations = []
+        for agent in self.game_setup.agents:
+            ai_integrations.append(GameAIIntegrations(agent, self.game_setup.replay_memory, decay_epsilon=id(agent) not in seen,
+                                                      writer=self.metrics))
+            seen.add(id(agent))
+        return ai_integrations
+
+    def replay_memory_filename(self):
+        # The shared learner's array buffer is saved with torch.save, not pickled
+        return 'replay_memory.pt' if isinstance(self.game_setup.replay_memory, ArrayReplayMemory) else 'replay_memory.pkl'
+
     def load_replay_memory(self):
-        self.game_setup.replay_memory.load_memory('replay_memory.pkl')
+        if self.replay_dir and self.learners and all(isinstance(agent.memory, ArrayReplayMemory) for agent in self.learners):
+            self.replay_storages = []
+            for agent_id, agent in enumerate(self.learners):
+                storage = ReplayStorage(os.path.join(self.replay_dir, f'agent_{agent_id}'))
+                storage.load(agent.memory)
+                self.replay_storages.append((storage, agent.memory))
+            print("Replay memory loaded")
+            return
+        self.game_setup.replay_memory.load_memory(self.replay_memory_filename())
         print("Replay memory loaded")
 
     def save_replay_memory(self):
-        self.game_setup.replay_memory.save_memory('replay_memory.pkl')
+        if self.replay_storages:
+            # Only new transitions are copied out; the files are written in the background
+            saved = sum(storage.checkpoint(memory) for storage, memory in self.replay_storages)
+            if self.verbose:
+                print(f"Queued {saved} new transitions for saving")
+            return
+        self.game_setup.replay_memory.save_memory(self.replay_memory_filename())
         print("Replay memory saved")
 
+    def close_replay_storages(self):
+        for storage, _ in self.replay_storages:
+            storage.close()
+
     async def run_game(self):
         try:
             while True:  # Run until an explicit break
                 print(f"Starting episode {self.episode}")
                 should_continue = await self.run_episode(self.episode)
                 self.save_replay_memory()
+                if self.checkpoints and self.checkpoints.should_save(self.episode):
+                    self.checkpoints.snapshot(self.learners, self.episode)  # Written in the background
                 if not should_continue:
                     break
+                if self.max_episodes and self.episode >= self.max_episodes:
+                    break
                 await self.reset_game_state()
                 self.update_display(self.episode, 0)  # Update display immediately after reset
                 self.episode += 1
         except Exception as e:
             print(f"Exception during game loop: {e}")
         finally:
-            for ai_integration in self.ai_integrations:
-                try:
-                    ai_integration.writer.close()
-                except Exception as e:
-                    print(f"Exception closing writer: {e}")
-            pygame.quit()
+            try:
+                self.metrics.close()
+            except Exception as e:
+                print(f"Exception closing writer: {e}")
+            self.stop_background_learners()
+            self.timer.close()
+            self.close_replay_storages()
+            if self.checkpoints:
+                self.checkpoints.close()
+            if not self.headless:
+                pygame.quit()
             print("Training loop terminated")
 
     async def run_episode(self, episode):
         if self.verbose:
             print(f"Starting episode {episode}")
         total_reward = 0
+        steps = 0
+        grad_steps_before = self.total_grad_steps
         self.start_time = time.time()
         self.game_setup.is_running = True
+        self.start_recording(episode)
+        timer = self.timer
+        self.profiler.start(episode)
 
         try:
             while self.game_setup.is_running:
-                handle_events(self.game_setup)
-                tasks = [self.update_agent(agent_id, ai_integration, episode) for agent_id, ai_integration in enumerate(self.ai_integrations)]
-                await asyncio.gather(*tasks)
+                if not self.headless:
+                    start = timer.start()
+                    handle_events(self.game_setup)
+                    timer.stop('events', start)
+                if self.game_setup.vectorized_physics:
+                    self.update_agents_vectorized(episode)
+                else:
+                    tasks = [self.update_agent(agent_id, ai_integration, episode) for agent_id, ai_integration in enumerate(self.ai_integrations)]
+                    await asyncio.gather(*tasks)
+                start = timer.start()
                 self.game_setup.update_platforms()
-                self.update_display(episode, total_reward)
+                timer.stop('platforms', start)
+                if self.recorder is not None:
+                    start = timer.start()
+                    self.recorder.record(self.tick_actions)
+                    timer.stop('record', start)
+                steps += 1
+                self.total_steps += 1
+                if self.train_every and not self.background_learners and self.total_steps % self.train_every == 0:
+                    self.train_learners(self.gradient_steps)
+                if self.render_every and steps % self.render_every == 0:
+                    start = timer.start()
+                    self.update_display(episode, total_reward)  # Camera is computed here, on demand
+                    timer.stop('render', start)
+                timer.report()
 
-                if time.time() - self.start_time > self.max_episode_duration:
+                if self.realtime and time.time() - self.start_time > self.max_episode_duration:
                     if self.verbose:
                         print(f"Episode {episode} ended due to exceeding maximum duration of {self.max_episode_duration} seconds.")
                     self.game_setup.is_running = False  # Ensure it stops the loop
                     break  # Break the loop to trigger reset
+                if not self.realtime and steps >= self.max_episode_steps:
+                    if self.verbose:
+                        print(f"Episode {episode} ended after {steps} steps.")
+                    self.game_setup.is_running = False
+                    break
 
-                await asyncio.sleep(0.016)  # Ensure this matches the frame update rate
+                if self.realtime:
+                    await asyncio.sleep(0.016)  # Ensure this matches the frame update rate
 
-            for ai_integration in self.ai_integrations:
-                ai_integration.writer.add_scalar('Total Reward', total_reward, episode)
-                ai_integration.agent.optimize_model()  # Optimize the model
+            self.profiler.stop()
+            self.metrics.add_scalar('Total Reward', total_reward, episode)
+            self.save_recording()
+            if self.background_learners:
+                self.total_grad_steps = sum(learner.updates for learner in self.background_learners)
+            elif not self.train_every:
+                self.train_learners(1)  # Optimize each distinct model once
 
+            elapsed = max(time.time() - self.start_time, 1e-9)
+            env_steps_per_sec = steps / elapsed
+            grad_steps_per_sec = (self.total_grad_steps - grad_steps_before) / elapsed
+            self.metrics.add_scalar('Perf/env_steps_per_sec', env_steps_per_sec, episode)
+            self.metrics.add_scalar('Perf/grad_steps_per_sec', grad_steps_per_sec, episode)
+            for phase, seconds in self.timer.totals.items():
+                self.metrics.add_scalar(f'Perf/seconds_{phase}', seconds, episode)  # Cumulative, compare slopes
             if self.verbose:
-                print(f"Episode {episode} completed with total reward: {total_reward}")
+                print(f"Episode {episode} completed with total reward: {total_reward} "
+                      f"({env_steps_per_sec:.0f} env steps/s, {grad_steps_per_sec:.1f} gradient steps/s)")
 
             return True
         except Exception as e:
             print(f"Exception during episode: {e}")
+            self.profiler.stop()
             return False
 
+    def train_learners(self, gradient_steps):
+        for agent in self.learners:
+            for _ in range(gradient_steps):
+                start = self.timer.start()
+                loss = agent.optimize_model()
+                self.timer.stop('train', start)
+                if loss is not None:  # None while the buffer is too small
+                    self.total_grad_steps += 1
+
     async def update_agent(self, agent_id, ai_integration, episode):
-        state = self.game_setup.get_state(agent_id)
-        state_tensor = torch.FloatTensor(state).view(1, -1)  # Ensure state has shape [1, feature_size]
+        state_tensor = self.agent_states[agent_id]
+        if state_tensor is None:
+            state_tensor = self.game_setup.get_state(agent_id)  # Shape [1, feature_size]
+        start = self.timer.start()
         action = ai_integration.select_action_and_update(state_tensor)
+        self.timer.stop('act', start)
         next_state, reward, done, current_score = self.step(agent_id, action)
+        self.tick_actions[agent_id] = action.item() if isinstance(action, torch.Tensor) else action
 
-        next_state_tensor = torch.FloatTensor(next_state).view(1, -1) if next_state is not None else None
+        next_state_tensor = next_state  # get_state already returns a [1, feature_size] tensor
+        self.agent_states[agent_id] = next_state_tensor
         reward_tensor = torch.FloatTensor([reward])
         done_tensor = torch.FloatTensor([done])
 
+        start = self.timer.start()
         ai_integration.agent.memory.push((state_tensor, action, next_state_tensor, reward_tensor))
+        self.timer.stop('memory', start)
 
+        start = self.timer.start()
         ai_integration.writer.add_scalar('Reward', reward, episode)
+        self.timer.stop('metrics', start)
 
         if self.verbose:
             print(f"Step result for agent {agent_id}: next_state={next_state}, reward={reward}, done={done}, score={current_score}")
             print(f"Reward written for agent {agent_id}")
 
+    def update_agents_vectorized(self, episode):
+        # Same as update_agent for every agent, but action selection and physics run batched
+        timer = self.timer
+        states = self.states if self.states is not None else self.game_setup.get_all_states()
+        start = timer.start()
+        actions = self.policy.select_actions(states)
+        self.policy.update_epsilon()
+        timer.stop('act', start)
+        next_states, rewards, dones, scores = self.step_all(actions.view(-1).tolist())
+        self.tick_actions[:] = actions.view(-1).numpy()
+
+        start = timer.start()
+        if self.game_setup.shared_learner and isinstance(self.game_setup.replay_memory, ArrayReplayMemory):
+            # Every player's transition goes into the shared buffer in one write
+            self.game_setup.replay_memory.push_batch(states, actions, rewards, next_states, dones)
+        else:
+            # states/next_states are reused buffers, so rows kept by a memory are cloned
+            for agent_id, ai_integration in enumerate(self.ai_integrations):
+                reward_tensor = torch.FloatTensor([rewards[agent_id]])
+                ai_integration.agent.memory.push((states[agent_id:agent_id + 1].clone(), actions[agent_id:agent_id + 1],
+                                                  next_states[agent_id:agent_id + 1].clone(), reward_tensor))
+        timer.stop('memory', start)
+        self.states = next_states
+        start = timer.start()
+        self.metrics.add_values('Reward', rewards, episode)
+        timer.stop('metrics', start)
+
     async def reset_game_state(self):
         print("Resetting game state...")
+        if self.layout_random:
+            self.game_setup.platform_manager.seed = self.next_layout_seed()  # Picked up by the reset below
         await self.game_setup.reset_game()
-        self.ai_integrations = [GameAIIntegrations(agent, self.game_setup.replay_memory) for agent in self.game_setup.agents]
+        self.states = None
+        self.agent_states = [None] * self.num_agents
+        self.ai_integrations = self.create_ai_integrations()
         self.update_display(self.episode, 0)
         if self.verbose:
             print("Game state reset complete.")
@@ -125,10 +370,17 @@ class TrainingLoop:
         if action in action_map:
             keys[action_map[action]] = True
 
+        timer = self.timer
+        start = timer.start()
         self.game_setup.update_players(agent_id, keys)
         on_platform = self.game_setup.check_on_platform(agent_id)
+        timer.stop('physics', start)
+        start = timer.start()
         next_state = self.game_setup.get_state(agent_id)
+        timer.stop('observe', start)
+        start = timer.start()
         reward = self.calculate_reward(agent_id, action, on_platform)
+        timer.stop('reward', start)
         done = False  # Always False
         score = self.game_setup.players[agent_id].score
         if self.verbose:
@@ -136,6 +388,26 @@ class TrainingLoop:
 
         return next_state, reward, done, score
 
+    def step_all(self, actions):
+        actions = [action.item() if isinstance(action, torch.Tensor) else action for action in actions]
+        timer = self.timer
+        start = timer.start()
+        self.game_setup.update_all_players(actions)
+        on_platform = self.game_setup.check_all_on_platform()
+        timer.stop('physics', start)
+
+        start = timer.start()
+        next_states = self.game_setup.get_all_states()  # (num_agents, feature_size), one build for everyone
+        timer.stop('observe', start)
+        start = timer.start()
+        rewards, dones, scores = [], [], []
+        for agent_id, action in enumerate(actions):
+            rewards.append(self.calculate_reward(agent_id, action, on_platform[agent_id]))
+            dones.append(False)  # Always False
+            scores.append(self.game_setup.players[agent_id].score)
+        timer.stop('reward', start)
+        return next_states, rewards, dones, scores
+
     def calculate_reward(self, agent_id, action, on_platform):
         reward = 0
         player = self.game_setup.players[agent_id]
@@ -156,7 +428,12 @@ class TrainingLoop:
         return reward
 
     def update_display(self, episode, total_reward):
+        if not self.queues:
+            return
         data = self.game_setup.get_render_data(episode, total_reward)
+        if hasattr(self.queues, 'publish'):
+            self.queues.publish(data)  # Overwrites any frame the display hasn't picked up yet
+            return
         for queue in self.queues:
             if not queue.full():  # Check if the queue is not full before putting data
                 queue.put_nowait(data)  # Use non-blocking put
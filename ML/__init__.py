@@ -1,3 +1,8 @@
 from .agent import Agent
 from .dqn_model import DQN
-from .memory import ReplayMemory
+from .memory import ReplayMemory, ArrayReplayMemory
+from .prioritized_memory import PrioritizedReplayMemory
+from .batched_policy import BatchedPolicy
+from .learner import BackgroundLearner
+from .checkpoint import CheckpointManager
+from .inference import ActorNetwork, NumpyDQN, set_torch_threads
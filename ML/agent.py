@@ -1,19 +1,30 @@
+import copy
+import threading
 import torch
 import torch.optim as optim
 import torch.nn.functional as F
 import random
 from collections import namedtuple
 from .dqn_model import DQN
-from .memory import ReplayMemory
+from .memory import ReplayMemory, ArrayReplayMemory
+from .prioritized_memory import PrioritizedReplayMemory
 
 # Defining the transition tuple that will be stored in the replay memory buffer.
 Transition = namedtuple('Transition', ('state', 'action', 'next_state', 'reward'))
 
 class Agent:
     def __init__(self, input_size, output_size, lr=0.001, gamma=0.99, batch_size=64, capacity=10000,
-                 epsilon_start=1.0, epsilon_final=0.01, epsilon_decay=0.999):
+                 epsilon_start=1.0, epsilon_final=0.01, epsilon_decay=0.999, array_memory=False,
+                 prioritized_memory=False, target_update=None, tau=None, double_dqn=False):
         self.dqn = DQN(input_size, output_size)
-        self.memory = ReplayMemory(capacity)
+        # array_memory: preallocated tensor ring buffer instead of a deque of tuples
+        # prioritized_memory: array buffer sampled by TD error, with importance-sampling weights
+        if prioritized_memory:
+            self.memory = PrioritizedReplayMemory(capacity, input_size)
+        elif array_memory:
+            self.memory = ArrayReplayMemory(capacity, input_size)
+        else:
+            self.memory = ReplayMemory(capacity)
         self.optimizer = optim.Adam(self.dqn.parameters(), lr=lr)
         self.gamma = gamma
         self.batch_size = batch_size
@@ -22,11 +33,30 @@ class Agent:
         self.epsilon_final = epsilon_final
         self.epsilon_decay = epsilon_decay
 
+        # Target network for bootstrapping: hard copy every target_update gradient steps,
+        # or Polyak-averaged with factor tau after every step. Without either, the online
+        # network bootstraps itself as before.
+        self.target_update = target_update
+        self.tau = tau
+        if double_dqn and not (target_update or tau):
+            # Without a target network the online net would both pick and evaluate: plain DQN
+            raise ValueError("double_dqn=True needs a target network; set target_update or tau")
+        self.double_dqn = double_dqn  # Online net picks the next action, target net evaluates it
+        self.target_dqn = None
+        if target_update or tau:
+            self.target_dqn = copy.deepcopy(self.dqn)
+            self.target_dqn.requires_grad_(False)
+        self.grad_steps = 0
+        self.actor_dqn = None  # Weights published by a BackgroundLearner; acting uses self.dqn until set
+        # Held by a BackgroundLearner for each gradient step, so snapshots never mix weights and
+        # optimizer moments from different steps
+        self.update_lock = threading.Lock()
+
     def select_action(self, state):
         # print(f"State shape: {state.shape}")  # Debugging statement
         if random.random() > self.epsilon:
             with torch.no_grad():
-                action = self.dqn(state).max(1)[1].view(1, 1)
+                action = self.policy_network()(state).max(1)[1].view(1, 1)
                 # print(f"Selected action (exploitation): {action}, shape: {action.shape}")  # Debugging statement
                 return action
         else:
@@ -35,6 +65,11 @@ class Agent:
             return action
 
 
+    def policy_network(self):
+        # Read the reference once: a learner thread may swap in new weights at any time
+        actor_dqn = self.actor_dqn
+        return actor_dqn if actor_dqn is not None else self.dqn
+
     def update_epsilon(self):
         self.epsilon = max(self.epsilon_final, self.epsilon * self.epsilon_decay)
 
@@ -42,17 +77,28 @@ class Agent:
         if len(self.memory) < self.batch_size:
             return
 
-        transitions = self.memory.sample(self.batch_size)
-        batch = Transition(*zip(*transitions))
+        weights = None
+        if isinstance(self.memory, PrioritizedReplayMemory):
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, weights, indices = self.memory.sample_weighted(self.batch_size)
+            non_final_mask = ~done_batch
+            non_final_next_states = next_state_batch[non_final_mask]
+        elif isinstance(self.memory, ArrayReplayMemory):
+            # The array buffer hands back ready-made batch tensors
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample_batch(self.batch_size)
+            non_final_mask = ~done_batch
+            non_final_next_states = next_state_batch[non_final_mask]
+        else:
+            transitions = self.memory.sample(self.batch_size)
+            batch = Transition(*zip(*transitions))
 
-        non_final_mask = torch.tensor(tuple(map(lambda s: s is not None, batch.next_state)), dtype=torch.bool)
-        non_final_next_states = torch.cat([s for s in batch.next_state if s is not None]).view(-1, self.dqn.fc1.in_features)  # Ensure correct shape
-        # print(f"Non-final mask shape: {non_final_mask.shape}")  # Debugging statement
-        # print(f"Non-final next states shape: {non_final_next_states.shape}")  # Debugging statement
+            non_final_mask = torch.tensor(tuple(map(lambda s: s is not None, batch.next_state)), dtype=torch.bool)
+            non_final_next_states = torch.cat([s for s in batch.next_state if s is not None]).view(-1, self.dqn.fc1.in_features)  # Ensure correct shape
+            # print(f"Non-final mask shape: {non_final_mask.shape}")  # Debugging statement
+            # print(f"Non-final next states shape: {non_final_next_states.shape}")  # Debugging statement
 
-        state_batch = torch.cat(batch.state).view(-1, self.dqn.fc1.in_features)  # Ensure correct shape
-        action_batch = torch.cat(batch.action).view(-1, 1)  # Ensure actions have shape [batch_size, 1]
-        reward_batch = torch.cat(batch.reward).view(-1, 1)  # Ensure rewards have shape [batch_size, 1]
+            state_batch = torch.cat(batch.state).view(-1, self.dqn.fc1.in_features)  # Ensure correct shape
+            action_batch = torch.cat(batch.action).view(-1, 1)  # Ensure actions have shape [batch_size, 1]
+            reward_batch = torch.cat(batch.reward).view(-1, 1)  # Ensure rewards have shape [batch_size, 1]
 
         # print(f"State batch shape: {state_batch.shape}")  # Debugging statement
         # print(f"Action batch shape: {action_batch.shape}")  # Debugging statement
@@ -65,7 +111,7 @@ class Agent:
         # Compute expected state-action values
         next_state_values = torch.zeros(self.batch_size, device=self.dqn.fc1.weight.device)
         if non_final_next_states.size(0) > 0:  # Check if there are any non-final next states
-            next_q_values = self.dqn(non_final_next_states).max(1)[0].detach()
+            next_q_values = self.next_q_values(non_final_next_states)
             # print(f"Next Q values shape: {next_q_values.shape}")  # Debugging statement
             next_state_values[non_final_mask] = next_q_values
 
@@ -75,7 +121,14 @@ class Agent:
         # print(f"Expected state action values shape: {expected_state_action_values.shape}")  # Debugging statement
 
         # Compute loss using smooth L1 loss
-        loss = F.smooth_l1_loss(state_action_values, expected_state_action_values)
+        if weights is not None:
+            # Importance-sampling weights correct the bias of prioritized sampling
+            elementwise_loss = F.smooth_l1_loss(state_action_values, expected_state_action_values, reduction='none')
+            loss = (weights * elementwise_loss).mean()
+            td_errors = (expected_state_action_values - state_action_values).detach()
+            self.memory.update_priorities(indices, td_errors.numpy())
+        else:
+            loss = F.smooth_l1_loss(state_action_values, expected_state_action_values)
         # print(f"Loss shape: {loss.shape}")  # Debugging statement
 
         # Perform backpropagation and optimization step
@@ -84,5 +137,26 @@ class Agent:
         for param in self.dqn.parameters():
             param.grad.data.clamp_(-1, 1)
         self.optimizer.step()
+        self.grad_steps += 1
+        self.update_target()
+        return loss.item()
+
+    def next_q_values(self, next_states):
+        with torch.no_grad():
+            bootstrap_dqn = self.target_dqn if self.target_dqn is not None else self.dqn
+            if self.double_dqn:
+                next_actions = self.dqn(next_states).argmax(1, keepdim=True)
+                return bootstrap_dqn(next_states).gather(1, next_actions).view(-1)
+            return bootstrap_dqn(next_states).max(1)[0]
+
+    def update_target(self):
+        if self.target_dqn is None:
+            return
+        if self.tau:
+            with torch.no_grad():
+                for target_param, param in zip(self.target_dqn.parameters(), self.dqn.parameters()):
+                    target_param.lerp_(param, self.tau)
+        elif self.grad_steps % self.target_update == 0:
+            self.target_dqn.load_state_dict(self.dqn.state_dict())
 
 
@@ -0,0 +1,45 @@
+import torch
+from .inference import ActorNetwork
+
+
+class BatchedPolicy:
+    """Epsilon-greedy action selection for many agents with one forward pass per network.
+
+    Agents that share a DQN (e.g. a shared learner) are served by a single
+    forward pass over all of their rows. backend selects how that pass runs
+    (see ML.inference.BACKENDS).
+    """
+
+    def __init__(self, agents, backend='eager'):
+        self.agents = agents
+        self.num_actions = agents[0].num_actions
+        self.unique_agents = list({id(agent): agent for agent in agents}.values())
+
+        # Rows of the batch handled by each distinct agent's network
+        groups = {}
+        for row, agent in enumerate(agents):
+            groups.setdefault(id(agent), (agent, []))[1].append(row)
+        self.groups = [(ActorNetwork(agent, backend), torch.tensor(rows)) for agent, rows in groups.values()]
+        self.single_group = len(self.groups) == 1
+
+    def greedy_actions(self, states):
+        if self.single_group:
+            return self.groups[0][0].greedy_actions(states)
+        actions = torch.empty(states.size(0), dtype=torch.long)
+        for actor, rows in self.groups:
+            actions[rows] = actor.greedy_actions(states[rows])
+        return actions
+
+    def select_actions(self, states):
+        """states: (num_agents, input_size) tensor. Returns (num_agents, 1) long tensor."""
+        epsilons = torch.tensor([agent.epsilon for agent in self.agents])
+        explore = torch.rand(len(self.agents)) <= epsilons
+        actions = self.greedy_actions(states)
+        if explore.any():
+            actions = torch.where(explore, torch.randint(0, self.num_actions, (len(self.agents),)), actions)
+        return actions.view(-1, 1)
+
+    def update_epsilon(self):
+        # Once per distinct agent, so a shared agent decays once per frame
+        for agent in self.unique_agents:
+            agent.update_epsilon()
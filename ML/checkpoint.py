@@ -0,0 +1,114 @@
+import copy
+import glob
+import os
+import queue
+import threading
+import torch
+
+
+def _clone_state(state_dict):
+    # Detached CPU copies so training can continue while the snapshot is written
+    return {key: value.detach().cpu().clone() if torch.is_tensor(value) else copy.deepcopy(value)
+            for key, value in state_dict.items()}
+
+
+class CheckpointManager:
+    """Snapshots agents' networks, optimizers and epsilon, writing them on a background thread.
+
+    Checkpoints are single files named checkpoint_<episode>.pt in directory;
+    only the newest keep_last (at least 1) are kept.
+    """
+
+    def __init__(self, directory='checkpoints', keep_last=3, save_every=10):
+        if keep_last < 1:
+            raise ValueError(f"keep_last must be at least 1, got {keep_last}")
+        self.directory = directory
+        self.keep_last = keep_last
+        self.save_every = save_every
+        os.makedirs(directory, exist_ok=True)
+        self.jobs = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def checkpoint_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, 'checkpoint_*.pt')))
+
+    def latest(self):
+        paths = self.checkpoint_paths()
+        return paths[-1] if paths else None
+
+    def should_save(self, episode):
+        return self.save_every and episode % self.save_every == 0
+
+    def snapshot(self, agents, episode):
+        """Copy the training state now and queue it for writing.
+
+        Each agent is copied under its update_lock, between two of a background learner's steps.
+        """
+        state = {'episode': episode, 'agents': []}
+        for agent in agents:
+            with agent.update_lock:
+                state['agents'].append(self.agent_state(agent))
+        self.jobs.put(state)
+
+    @staticmethod
+    def agent_state(agent):
+        optimizer_state = agent.optimizer.state_dict()
+        return {
+            'dqn': _clone_state(agent.dqn.state_dict()),
+            'target_dqn': _clone_state(agent.target_dqn.state_dict()) if agent.target_dqn is not None else None,
+            'optimizer': {'state': {key: _clone_state(value) for key, value in optimizer_state['state'].items()},
+                          'param_groups': copy.deepcopy(optimizer_state['param_groups'])},
+            'epsilon': agent.epsilon,
+            'grad_steps': agent.grad_steps,
+        }
+
+    def write_loop(self):
+        while True:
+            state = self.jobs.get()
+            try:
+                if state is None:
+                    return
+                self.write(state)
+            except Exception as e:
+                print(f"Error writing checkpoint to '{self.directory}': {e}")
+            finally:
+                self.jobs.task_done()
+
+    def write(self, state):
+        path = os.path.join(self.directory, f"checkpoint_{state['episode']:06d}.pt")
+        tmp_path = path + '.tmp'
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)  # Readers never see a partial file
+        for old_path in self.checkpoint_paths()[:-self.keep_last]:
+            os.remove(old_path)
+        print(f"Saved checkpoint '{path}'")
+
+    def load(self, agents, path=None):
+        """Restore agents from path (default: latest). Returns the saved episode, or None."""
+        path = path or self.latest()
+        if path is None:
+            print(f"No checkpoint found in '{self.directory}'")
+            return None
+        state = torch.load(path)
+        if len(state['agents']) != len(agents):
+            print(f"Checkpoint '{path}' has {len(state['agents'])} agents, expected {len(agents)}")
+            return None
+        for agent, agent_state in zip(agents, state['agents']):
+            agent.dqn.load_state_dict(agent_state['dqn'])
+            if agent.target_dqn is not None:
+                agent.target_dqn.load_state_dict(agent_state['target_dqn'] or agent_state['dqn'])
+            agent.optimizer.load_state_dict(agent_state['optimizer'])
+            agent.epsilon = agent_state['epsilon']
+            agent.grad_steps = agent_state['grad_steps']
+            agent.actor_dqn = None
+        print(f"Loaded checkpoint '{path}' (episode {state['episode']})")
+        return state['episode']
+
+    def wait(self):
+        self.jobs.join()
+
+    def close(self):
+        self.wait()
+        self.jobs.put(None)
+        self.writer.join()
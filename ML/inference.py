@@ -0,0 +1,116 @@
+import copy
+import warnings
+import numpy as np
+import torch
+import torch.nn as nn
+
+# Ways to run the DQN forward pass for acting:
+#   eager        the training module itself under torch.inference_mode()
+#   torchscript  a frozen TorchScript copy (weights folded in as constants)
+#   quantized    a copy with dynamic int8 Linear layers (torch.ao.quantization, deprecated upstream;
+#                slower than eager for a network this small, see Benchmarks/inference_benchmark.py)
+#   numpy        plain NumPy matmuls on views of the training weights
+BACKENDS = ('eager', 'torchscript', 'quantized', 'numpy')
+SHARED_WEIGHT_BACKENDS = ('eager', 'numpy')  # Follow in-place weight updates without being rebuilt
+
+
+def set_torch_threads(num_threads=None, interop_threads=None):
+    """Limit torch's intra-op (and inter-op) thread pools for this process.
+
+    With many actor or worker processes on one machine, torch's default of one
+    thread per core oversubscribes the CPU; small batches run fastest on one
+    thread. The inter-op pool can only be sized before torch first uses it.
+    """
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    if interop_threads is not None:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            print(f"Could not set torch inter-op threads: {e}")
+
+
+class NumpyDQN:
+    """The DQN forward pass in NumPy, without torch dispatch or autograd bookkeeping.
+
+    The weights are views of the torch parameters, not copies, so in-place
+    optimizer steps and load_state_dict() show up here immediately.
+    """
+
+    def __init__(self, dqn):
+        self.dqn = dqn
+        self.layers = [(layer.weight.detach().numpy().T, layer.bias.detach().numpy())
+                       for layer in (dqn.fc1, dqn.fc2, dqn.out)]
+
+    def __call__(self, states):
+        x = np.asarray(states, dtype=np.float32)
+        last = len(self.layers) - 1
+        for i, (weight, bias) in enumerate(self.layers):
+            x = x @ weight
+            x += bias
+            if i < last:
+                np.maximum(x, 0, out=x)
+        return x
+
+
+def compile_network(dqn, backend='eager'):
+    if backend == 'eager':
+        return dqn
+    if backend == 'numpy':
+        return NumpyDQN(dqn)
+    network = copy.deepcopy(dqn).eval()
+    network.requires_grad_(False)
+    # torch.jit and torch.ao.quantization warn that they are deprecated on every call; ActorNetwork
+    # recompiles on each weight publish, so keep the warnings out of the training output
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        warnings.simplefilter('ignore', FutureWarning)
+        warnings.filterwarnings('ignore', message='.*deprecated.*', category=UserWarning)
+        if backend == 'torchscript':
+            return torch.jit.freeze(torch.jit.script(network))
+        if backend == 'quantized':
+            return torch.ao.quantization.quantize_dynamic(network, {nn.Linear}, dtype=torch.qint8)
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+
+class ActorNetwork:
+    """Greedy actions from an agent's acting network through one of BACKENDS.
+
+    Follows agent.policy_network(): a new network object (e.g. a
+    BackgroundLearner publish) is compiled on first use. The torchscript and
+    quantized backends work on copies, so while acting from the live
+    training network they are also recompiled every refresh_every gradient
+    steps, i.e. they may lag it by up to that many updates.
+    """
+
+    def __init__(self, agent, backend='eager', refresh_every=100):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+        self.agent = agent
+        self.backend = backend
+        self.refresh_every = refresh_every
+        self.source = None
+        self.version = None
+        self.compiled = None
+
+    def network(self):
+        source = self.agent.policy_network()
+        version = None
+        if self.backend not in SHARED_WEIGHT_BACKENDS and source is self.agent.dqn:
+            version = self.agent.grad_steps // self.refresh_every
+        if source is not self.source or version != self.version:
+            self.compiled = compile_network(source, self.backend)
+            self.source = source
+            self.version = version
+        return self.compiled
+
+    def q_values(self, states):
+        network = self.network()
+        if self.backend == 'numpy':
+            return torch.from_numpy(network(states.numpy() if torch.is_tensor(states) else states))
+        with torch.inference_mode():
+            return network(torch.as_tensor(states))
+
+    def greedy_actions(self, states):
+        """states: (batch, input_size) tensor or array. Returns a (batch,) long tensor."""
+        return self.q_values(states).argmax(1)
@@ -0,0 +1,66 @@
+import copy
+import threading
+import time
+
+
+class BackgroundLearner:
+    """Trains an Agent on a background thread while the game loop keeps acting.
+
+    The thread samples from agent.memory (guarded by its lock) and calls
+    agent.optimize_model() continuously. Every publish_every gradient steps
+    it hands a snapshot of the weights to the actors by swapping
+    agent.actor_dqn, so acting never sees half-copied weights and the actors'
+    policy is at most publish_every updates stale. max_train_ratio, if set,
+    caps gradient steps per transition pushed, so the learner waits for new
+    data instead of overfitting the same samples.
+    """
+
+    def __init__(self, agent, publish_every=100, max_train_ratio=None, idle_sleep=0.001):
+        self.agent = agent
+        self.publish_every = publish_every
+        self.max_train_ratio = max_train_ratio
+        self.idle_sleep = idle_sleep
+        self.updates = 0
+        self.publications = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.publish()
+
+    def start(self):
+        self.thread.start()
+
+    def publish(self):
+        actor_dqn = copy.deepcopy(self.agent.dqn)
+        actor_dqn.requires_grad_(False)
+        self.agent.actor_dqn = actor_dqn  # Single reference swap, atomic for the actors
+        self.publications += 1
+
+    def should_wait(self):
+        memory = self.agent.memory
+        if len(memory) < self.agent.batch_size:
+            return True
+        if self.max_train_ratio is not None:
+            return self.updates >= self.max_train_ratio * memory.total_pushed
+        return False
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.should_wait():
+                time.sleep(self.idle_sleep)
+                continue
+            try:
+                with self.agent.update_lock:
+                    self.agent.optimize_model()
+            except Exception as e:
+                print(f"Exception in background learner: {e}")
+                self.stop_event.set()
+                break
+            self.updates += 1
+            if self.updates % self.publish_every == 0:
+                self.publish()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.publish()  # Leave the actors with the final weights
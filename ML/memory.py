@@ -3,16 +3,19 @@ import os
 import random
 import pickle
 import threading
+import torch
 
 class ReplayMemory:
     def __init__(self, capacity):
         self.capacity = capacity
         self.memory = collections.deque(maxlen=capacity)
         self.lock = threading.Lock()
+        self.total_pushed = 0  # Transitions pushed since creation, including evicted ones
 
     def push(self, transition):
         with self.lock:
             self.memory.append(transition)
+            self.total_pushed += 1
 
     def sample(self, batch_size):
         with self.lock:
@@ -50,5 +53,124 @@ class ReplayMemory:
             self.memory.clear()
             print("Cleared replay memory")
 
+class ArrayReplayMemory:
+    """Ring buffer backed by preallocated tensors, one per transition field.
+
+    push() accepts the same (state, action, next_state, reward) tuples as
+    ReplayMemory; a next_state of None marks a terminal transition.
+    sample_batch() returns ready-made batch tensors.
+    """
+
+    def __init__(self, capacity, state_size):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.states = torch.zeros((capacity, state_size), dtype=torch.float32)
+        self.actions = torch.zeros((capacity, 1), dtype=torch.long)
+        self.rewards = torch.zeros((capacity, 1), dtype=torch.float32)
+        self.next_states = torch.zeros((capacity, state_size), dtype=torch.float32)
+        self.dones = torch.zeros(capacity, dtype=torch.bool)
+        self.position = 0  # Next slot to write
+        self.size = 0
+        self.total_pushed = 0  # Transitions pushed since creation, including overwritten ones
+        self.lock = threading.Lock()
+
+    def push(self, transition):
+        state, action, next_state, reward = transition[:4]
+        with self.lock:
+            i = self.position
+            self.states[i] = torch.as_tensor(state, dtype=torch.float32).view(-1)
+            self.actions[i] = torch.as_tensor(action).view(-1)
+            self.rewards[i] = torch.as_tensor(reward, dtype=torch.float32).view(-1)
+            if next_state is None:
+                self.next_states[i] = 0
+                self.dones[i] = True
+            else:
+                self.next_states[i] = torch.as_tensor(next_state, dtype=torch.float32).view(-1)
+                self.dones[i] = bool(transition[4]) if len(transition) > 4 else False
+            self.advance(1)
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """Write a batch of transitions (e.g. one per agent) with a few slice copies."""
+        states = torch.as_tensor(states, dtype=torch.float32).view(-1, self.state_size)
+        count = states.size(0)
+        fields = (
+            (self.states, states),
+            (self.actions, torch.as_tensor(actions, dtype=torch.long).view(-1, 1)),
+            (self.rewards, torch.as_tensor(rewards, dtype=torch.float32).view(-1, 1)),
+            (self.next_states, torch.as_tensor(next_states, dtype=torch.float32).view(-1, self.state_size)),
+            (self.dones, torch.as_tensor(dones, dtype=torch.bool).view(-1)),
+        )
+        # Only the newest `capacity` rows survive; writing more would repeat indices in one assignment
+        skipped = max(count - self.capacity, 0)
+        with self.lock:
+            self.position = (self.position + skipped) % self.capacity
+            self.total_pushed += skipped
+            indices = (self.position + torch.arange(count - skipped)) % self.capacity
+            for buffer, values in fields:
+                buffer[indices] = values[skipped:]
+            self.advance(count - skipped)
+
+    def advance(self, count):
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+        self.total_pushed += count
+
+    def sample_indices(self, batch_size):
+        return torch.randint(0, self.size, (batch_size,))
+
+    def gather(self, indices):
+        return (self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices])
+
+    def sample_batch(self, batch_size):
+        """Uniformly sample (states, actions, rewards, next_states, dones) batch tensors."""
+        with self.lock:
+            return self.gather(self.sample_indices(batch_size))
+
+    def sample(self, batch_size):
+        # Same output as ReplayMemory.sample, for code that expects transition tuples
+        states, actions, rewards, next_states, dones = self.sample_batch(batch_size)
+        return [(states[i:i + 1], actions[i:i + 1], None if dones[i] else next_states[i:i + 1], rewards[i])
+                for i in range(batch_size)]
+
+    def __len__(self):
+        with self.lock:
+            return self.size
+
+    def save_memory(self, filename):
+        with self.lock:
+            try:
+                torch.save({'states': self.states[:self.size], 'actions': self.actions[:self.size],
+                            'rewards': self.rewards[:self.size], 'next_states': self.next_states[:self.size],
+                            'dones': self.dones[:self.size], 'position': self.position}, filename)
+                print(f"Saved replay memory to '{filename}'")
+            except Exception as e:
+                print(f"Error saving replay memory to '{filename}': {e}")
+
+    def load_memory(self, filename):
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            with self.lock:
+                try:
+                    data = torch.load(filename)
+                    size = min(data['states'].size(0), self.capacity)
+                    self.states[:size] = data['states'][:size]
+                    self.actions[:size] = data['actions'][:size]
+                    self.rewards[:size] = data['rewards'][:size]
+                    self.next_states[:size] = data['next_states'][:size]
+                    self.dones[:size] = data['dones'][:size]
+                    self.size = size
+                    self.position = data['position'] % self.capacity if size == self.capacity else size
+                    print(f"Loaded replay memory from '{filename}'")
+                except Exception as e:
+                    print(f"Error loading replay memory from '{filename}': {e}")
+        else:
+            print(f"File '{filename}' does not exist or is empty.")
+
+    def clear(self):
+        with self.lock:
+            self.position = 0
+            self.size = 0
+            print("Cleared replay memory")
+
 # Define the replay memory
 # replay_memory = ReplayMemory(capacity=10000)
\ No newline at end of file
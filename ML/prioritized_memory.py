@@ -0,0 +1,126 @@
+import numpy as np
+import torch
+from .memory import ArrayReplayMemory
+
+
+class SumTree:
+    """Binary segment tree over leaf priorities. All operations take index arrays
+    and walk the tree one level at a time, so a whole batch costs O(log n) numpy ops."""
+
+    def __init__(self, capacity, neutral=0.0):
+        self.size = 1
+        while self.size < capacity:
+            self.size *= 2
+        self.neutral = neutral
+        self.tree = np.full(2 * self.size, neutral, dtype=np.float64)
+
+    def combine(self, left, right):
+        return left + right
+
+    def update(self, indices, values):
+        nodes = np.asarray(indices, dtype=np.int64) + self.size
+        self.tree[nodes] = values
+        nodes = np.unique(nodes)
+        while nodes[0] > 1:
+            nodes //= 2
+            # Still sorted, so duplicates are neighbours
+            nodes = nodes[np.concatenate(([True], nodes[1:] != nodes[:-1]))]
+            self.tree[nodes] = self.combine(self.tree[2 * nodes], self.tree[2 * nodes + 1])
+
+    def root(self):
+        return self.tree[1]
+
+    def find_prefixsum(self, values):
+        # Leaf index where the running sum of priorities first exceeds each value
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.size:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values = np.where(go_right, values - left_sum, values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.size
+
+
+class MinTree(SumTree):
+    def __init__(self, capacity):
+        super().__init__(capacity, neutral=np.inf)
+
+    def combine(self, left, right):
+        return np.minimum(left, right)
+
+
+class PrioritizedReplayMemory(ArrayReplayMemory):
+    """ArrayReplayMemory that samples transitions in proportion to priority**alpha.
+
+    sample_weighted() also returns importance-sampling weights and the sampled
+    indices, which go back into update_priorities() with the new TD errors.
+    """
+
+    def __init__(self, capacity, state_size, alpha=0.6, beta=0.4, beta_increment=1e-4, epsilon=1e-6):
+        super().__init__(capacity, state_size)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.sum_tree = SumTree(capacity)
+        self.min_tree = MinTree(capacity)
+
+    def advance(self, count):
+        # New transitions get the highest priority seen so far, so each is replayed at least once
+        indices = (self.position + np.arange(count)) % self.capacity
+        priority = self.max_priority ** self.alpha
+        self.sum_tree.update(indices, priority)
+        self.min_tree.update(indices, priority)
+        super().advance(count)
+
+    def sample_indices(self, batch_size):
+        # Stratified sampling: one draw from each of batch_size equal slices of the total priority
+        total = self.sum_tree.root()
+        bounds = (np.arange(batch_size) + np.random.random(batch_size)) * (total / batch_size)
+        indices = self.sum_tree.find_prefixsum(bounds)
+        return np.minimum(indices, self.size - 1)
+
+    def sample_weighted(self, batch_size):
+        """Returns (states, actions, rewards, next_states, dones, weights, indices)."""
+        with self.lock:
+            indices = self.sample_indices(batch_size)
+            total = self.sum_tree.root()
+            probabilities = self.sum_tree.tree[indices + self.sum_tree.size] / total
+            min_probability = self.min_tree.root() / total
+            max_weight = (min_probability * self.size) ** -self.beta
+            weights = (probabilities * self.size) ** -self.beta / max_weight
+            self.beta = min(1.0, self.beta + self.beta_increment)
+            batch = self.gather(torch.from_numpy(indices))
+        return batch + (torch.as_tensor(weights, dtype=torch.float32).view(-1, 1), indices)
+
+    def sample_batch(self, batch_size):
+        return self.sample_weighted(batch_size)[:5]
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64).reshape(-1)) + self.epsilon
+        with self.lock:
+            self.sum_tree.update(indices, priorities ** self.alpha)
+            self.min_tree.update(indices, priorities ** self.alpha)
+            self.max_priority = max(self.max_priority, priorities.max())
+
+    def reset_priorities(self):
+        # Priorities are not persisted, loaded transitions start at max priority
+        if self.size:
+            with self.lock:
+                indices = np.arange(self.size)
+                self.sum_tree.update(indices, self.max_priority ** self.alpha)
+                self.min_tree.update(indices, self.max_priority ** self.alpha)
+
+    def load_memory(self, filename):
+        super().load_memory(filename)
+        self.reset_priorities()
+
+    def clear(self):
+        with self.lock:
+            self.sum_tree = SumTree(self.capacity)
+            self.min_tree = MinTree(self.capacity)
+            self.max_priority = 1.0
+        super().clear()
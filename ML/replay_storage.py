@@ -0,0 +1,138 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import numpy as np
+import torch
+
+FIELDS = ('states', 'actions', 'rewards', 'next_states', 'dones')
+
+
+class ReplayStorage:
+    """Columnar on-disk checkpoints for an ArrayReplayMemory.
+
+    Every checkpoint() appends only the transitions pushed since the previous
+    one as a segment directory of .npy files, one per field. Segments and the
+    manifest are written by a background thread and made visible with atomic
+    renames, so push() is only blocked while the new rows are copied out.
+    load() memory-maps the segments and copies the newest `capacity` rows
+    straight from the files into the buffer, without intermediate arrays.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self.manifest = self.read_manifest()
+        self.saved_total = self.manifest['total_pushed']
+        self.jobs = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def read_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {'segments': [], 'total_pushed': 0, 'next_segment': 0}
+
+    def checkpoint(self, memory):
+        """Queue the transitions pushed since the last checkpoint for writing."""
+        with memory.lock:
+            count = min(memory.total_pushed - self.saved_total, memory.size)
+            if count <= 0:
+                return 0
+            indices = (memory.position - count + torch.arange(count)) % memory.capacity
+            columns = {field: getattr(memory, field)[indices].numpy() for field in FIELDS}
+            self.saved_total = memory.total_pushed
+            capacity = memory.capacity
+        self.jobs.put((columns, count, self.saved_total, capacity))
+        return count
+
+    def write_loop(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                self.write_segment(*job)
+            except Exception as e:
+                print(f"Error writing replay segment to '{self.directory}': {e}")
+            finally:
+                self.jobs.task_done()
+
+    def write_segment(self, columns, count, total_pushed, capacity):
+        name = f"segment_{self.manifest['next_segment']:06d}"
+        tmp_path = os.path.join(self.directory, name + '.tmp')
+        segment_path = os.path.join(self.directory, name)
+        # Leftovers of a crash before the manifest was written are not referenced by it
+        for path in (tmp_path, segment_path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for field, values in columns.items():
+            np.save(os.path.join(tmp_path, field + '.npy'), values)
+        os.replace(tmp_path, segment_path)
+
+        manifest = dict(self.manifest)
+        manifest['segments'] = self.manifest['segments'] + [{'name': name, 'count': count}]
+        manifest['total_pushed'] = total_pushed
+        manifest['next_segment'] = self.manifest['next_segment'] + 1
+
+        # Segments entirely older than the newest `capacity` transitions are no longer needed
+        expired = []
+        kept = 0
+        for segment in reversed(manifest['segments']):
+            if kept >= capacity:
+                expired.append(segment)
+            kept += segment['count']
+        manifest['segments'] = [segment for segment in manifest['segments'] if segment not in expired]
+
+        tmp_manifest = self.manifest_path + '.tmp'
+        with open(tmp_manifest, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, self.manifest_path)
+        self.manifest = manifest
+        for segment in expired:
+            shutil.rmtree(os.path.join(self.directory, segment['name']), ignore_errors=True)
+
+    def load(self, memory):
+        """Fill memory with the newest transitions on disk. Returns the number loaded."""
+        segments = self.manifest['segments']
+        if not segments:
+            print(f"No replay segments in '{self.directory}'")
+            return 0
+        # Newest segments first: (segment, rows to take from its end)
+        parts = []
+        remaining = memory.capacity
+        for segment in reversed(segments):
+            if remaining <= 0:
+                break
+            take = min(segment['count'], remaining)
+            parts.append((segment, take))
+            remaining -= take
+
+        with memory.lock:
+            size = memory.capacity - remaining
+            end = size
+            for segment, take in parts:
+                for field in FIELDS:
+                    values = np.load(os.path.join(self.directory, segment['name'], field + '.npy'), mmap_mode='r')
+                    getattr(memory, field).numpy()[end - take:end] = values[len(values) - take:]  # One copy, file to buffer
+                end -= take
+            memory.size = size
+            memory.position = size % memory.capacity
+            memory.total_pushed = self.manifest['total_pushed']
+            self.saved_total = memory.total_pushed
+        if hasattr(memory, 'reset_priorities'):
+            memory.reset_priorities()
+        print(f"Loaded {size} transitions from '{self.directory}'")
+        return size
+
+    def wait(self):
+        """Block until all queued checkpoints are on disk."""
+        self.jobs.join()
+
+    def close(self):
+        self.wait()
+        self.jobs.put(None)
+        self.writer.join()